@@ -5,4 +5,5 @@ class DashboardConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'dashboard'
 
-
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,41 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.http import quote_etag
+from rest_framework.renderers import JSONRenderer
+
+
+ADMIN_OVERVIEW_KEY = 'dashboard:admin_overview'
+
+
+def worker_summary_key(user_id):
+    return f'dashboard:worker:{user_id}'
+
+
+def customer_summary_key(user_id):
+    return f'dashboard:customer:{user_id}'
+
+
+def build_entry(data):
+    """Pair the counts with the ETag of their rendered JSON, computed once per cache epoch."""
+    body = JSONRenderer().render(data)
+    return {'data': data, 'etag': quote_etag(hashlib.md5(body, usedforsecurity=False).hexdigest())}
+
+
+def get_or_compute(key, compute):
+    return cache.get_or_set(key, lambda: build_entry(compute()), settings.DASHBOARD_CACHE_TIMEOUT)
+
+
+def invalidate_admin_overview():
+    cache.delete(ADMIN_OVERVIEW_KEY)
+
+
+def invalidate_worker_summary(user_id):
+    if user_id is not None:
+        cache.delete(worker_summary_key(user_id))
+
+
+def invalidate_customer_summary(user_id):
+    if user_id is not None:
+        cache.delete(customer_summary_key(user_id))
@@ -0,0 +1,125 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connection, connections
+from django.db.models import Count, Q
+
+from users.models import User
+from service_requests.models import ServiceRequest
+from tasks.models import Task
+
+
+ADMIN_OVERVIEW_FIELDS = (
+    'users_total', 'users_admins', 'users_workers', 'users_customers',
+    'service_requests_total', 'service_requests_open', 'service_requests_in_progress',
+    'service_requests_completed', 'tasks_total', 'tasks_assigned',
+    'tasks_in_progress', 'tasks_completed',
+)
+
+
+def _user_counts():
+    return User.objects.aggregate(
+        users_total=Count('id'),
+        users_admins=Count('id', filter=Q(role='admin')),
+        users_workers=Count('id', filter=Q(role='field_worker')),
+        users_customers=Count('id', filter=Q(role='customer')),
+    )
+
+
+def _service_request_counts():
+    return ServiceRequest.objects.aggregate(
+        service_requests_total=Count('id'),
+        service_requests_open=Count('id', filter=Q(status='open')),
+        service_requests_in_progress=Count('id', filter=Q(status='in_progress')),
+        service_requests_completed=Count('id', filter=Q(status='completed')),
+    )
+
+
+def _task_counts():
+    return Task.objects.aggregate(
+        tasks_total=Count('id'),
+        tasks_assigned=Count('id', filter=Q(status='assigned')),
+        tasks_in_progress=Count('id', filter=Q(status='in_progress')),
+        tasks_completed=Count('id', filter=Q(status='completed')),
+    )
+
+
+def _admin_overview_single_query():
+    # All twelve counts in one round trip: three single-row aggregates
+    # cross-joined. COUNT(CASE ...) yields 0 rather than NULL on empty tables.
+    quote = connection.ops.quote_name
+    sql = f"""
+        SELECT u.total, u.admins, u.workers, u.customers,
+               s.total, s.open, s.in_progress, s.completed,
+               t.total, t.assigned, t.in_progress, t.completed
+        FROM (
+            SELECT COUNT(*) AS total,
+                   COUNT(CASE WHEN role = %s THEN 1 END) AS admins,
+                   COUNT(CASE WHEN role = %s THEN 1 END) AS workers,
+                   COUNT(CASE WHEN role = %s THEN 1 END) AS customers
+            FROM {quote(User._meta.db_table)}
+        ) u
+        CROSS JOIN (
+            SELECT COUNT(*) AS total,
+                   COUNT(CASE WHEN status = %s THEN 1 END) AS open,
+                   COUNT(CASE WHEN status = %s THEN 1 END) AS in_progress,
+                   COUNT(CASE WHEN status = %s THEN 1 END) AS completed
+            FROM {quote(ServiceRequest._meta.db_table)}
+        ) s
+        CROSS JOIN (
+            SELECT COUNT(*) AS total,
+                   COUNT(CASE WHEN status = %s THEN 1 END) AS assigned,
+                   COUNT(CASE WHEN status = %s THEN 1 END) AS in_progress,
+                   COUNT(CASE WHEN status = %s THEN 1 END) AS completed
+            FROM {quote(Task._meta.db_table)}
+        ) t
+    """
+    params = [
+        'admin', 'field_worker', 'customer',
+        ServiceRequest.Status.OPEN, ServiceRequest.Status.IN_PROGRESS, ServiceRequest.Status.COMPLETED,
+        Task.Status.ASSIGNED, Task.Status.IN_PROGRESS, Task.Status.COMPLETED,
+    ]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        row = cursor.fetchone()
+    return dict(zip(ADMIN_OVERVIEW_FIELDS, row))
+
+
+def _in_own_connection(func):
+    # Each worker thread opens its own connection; close it before the
+    # thread goes back to the pool so connections don't leak.
+    try:
+        return func()
+    finally:
+        connections.close_all()
+
+
+def admin_overview_counts():
+    if not settings.DASHBOARD_PARALLEL_AGGREGATES:
+        return _admin_overview_single_query()
+
+    aggregates = (_user_counts, _service_request_counts, _task_counts)
+    with ThreadPoolExecutor(max_workers=len(aggregates)) as executor:
+        results = list(executor.map(_in_own_connection, aggregates))
+
+    data = {}
+    for result in results:
+        data.update(result)
+    return data
+
+
+def worker_counts(user):
+    return Task.objects.filter(assigned_to=user).aggregate(
+        assigned=Count('id', filter=Q(status='assigned')),
+        in_progress=Count('id', filter=Q(status='in_progress')),
+        completed=Count('id', filter=Q(status='completed')),
+    )
+
+
+def customer_counts(user):
+    return ServiceRequest.objects.filter(customer=user).aggregate(
+        requests_total=Count('id'),
+        requests_open=Count('id', filter=Q(status='open')),
+        requests_in_progress=Count('id', filter=Q(status='in_progress')),
+        requests_completed=Count('id', filter=Q(status='completed')),
+    )
@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+
+from dashboard.cache import ADMIN_OVERVIEW_KEY, build_entry
+from dashboard.counts import admin_overview_counts
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the admin overview counts and store them in the cache. "
+        "Schedule it (e.g. from cron) more often than --timeout so the "
+        "dashboard never computes counts on a request."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--timeout',
+            type=int,
+            default=settings.DASHBOARD_CACHE_TIMEOUT,
+            help='Seconds the refreshed counts stay cached.',
+        )
+
+    def handle(self, *args, **options):
+        data = admin_overview_counts()
+        cache.set(ADMIN_OVERVIEW_KEY, build_entry(data), options['timeout'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Admin overview cached for {options['timeout']}s: "
+            f"{data['users_total']} users, {data['service_requests_total']} service requests, "
+            f"{data['tasks_total']} tasks."
+        ))
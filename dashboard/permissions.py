@@ -1,13 +0,0 @@
-from rest_framework.permissions import BasePermission
-
-
-class IsAdminUserRole(BasePermission):
-    """
-    Allows access only to users with custom admin role attribute `is_admin`.
-    """
-
-    def has_permission(self, request, view):
-        user = request.user
-        return bool(user and user.is_authenticated and getattr(user, 'is_admin', False))
-
-
@@ -0,0 +1,39 @@
+"""
+Drop cached dashboard counts when the models they count change.
+
+Every receiver invalidates once the write commits; dropping the keys earlier
+lets a concurrent request cache the pre-commit counts again.
+"""
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from users.models import User
+from service_requests.models import ServiceRequest
+from tasks.models import Task
+
+from .cache import invalidate_admin_overview, invalidate_customer_summary, invalidate_worker_summary
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, using, **kwargs):
+    transaction.on_commit(invalidate_admin_overview, using=using)
+
+
+@receiver(post_save, sender=ServiceRequest)
+@receiver(post_delete, sender=ServiceRequest)
+def service_request_changed(sender, instance, using, **kwargs):
+    transaction.on_commit(invalidate_admin_overview, using=using)
+    transaction.on_commit(partial(invalidate_customer_summary, instance.customer_id), using=using)
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def task_changed(sender, instance, using, **kwargs):
+    # A task reassigned away from a worker leaves that worker's summary
+    # stale until DASHBOARD_CACHE_TIMEOUT expires.
+    transaction.on_commit(invalidate_admin_overview, using=using)
+    transaction.on_commit(partial(invalidate_worker_summary, instance.assigned_to_id), using=using)
@@ -3,14 +3,19 @@ Test cases for dashboard functionality.
 Tests dashboard counts and data accuracy for all user roles.
 """
 import json
-from django.test import TestCase
+from io import StringIO
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
 from django.urls import reverse
 from rest_framework.test import APIClient
-from rest_framework import status
+from rest_framework import serializers, status
 from django.contrib.auth import get_user_model
 from rest_framework_simplejwt.tokens import RefreshToken
 from service_requests.models import ServiceRequest
 from tasks.models import Task
+from dashboard import counts
+from dashboard.serializers import AdminOverviewSerializer, CustomerSummarySerializer, WorkerSummarySerializer
 
 User = get_user_model()
 
@@ -18,12 +23,11 @@ User = get_user_model()
 class DashboardTestCase(TestCase):
     """Test cases for dashboard functionality."""
     
-    def setUp(self):
-        """Set up test data."""
-        self.client = APIClient()
-        
+    @classmethod
+    def setUpTestData(cls):
+        """Set up test data once for the whole class."""
         # Create test users
-        self.customer1 = User.objects.create_user(
+        cls.customer1 = User.objects.create_user(
             username='customer1',
             email='customer1@test.com',
             password='testpass123',
@@ -31,7 +35,7 @@ class DashboardTestCase(TestCase):
             is_approved=True
         )
         
-        self.customer2 = User.objects.create_user(
+        cls.customer2 = User.objects.create_user(
             username='customer2',
             email='customer2@test.com',
             password='testpass123',
@@ -39,7 +43,7 @@ class DashboardTestCase(TestCase):
             is_approved=True
         )
         
-        self.field_worker1 = User.objects.create_user(
+        cls.field_worker1 = User.objects.create_user(
             username='worker1',
             email='worker1@test.com',
             password='testpass123',
@@ -47,7 +51,7 @@ class DashboardTestCase(TestCase):
             is_approved=True
         )
         
-        self.field_worker2 = User.objects.create_user(
+        cls.field_worker2 = User.objects.create_user(
             username='worker2',
             email='worker2@test.com',
             password='testpass123',
@@ -55,7 +59,7 @@ class DashboardTestCase(TestCase):
             is_approved=True
         )
         
-        self.unapproved_worker = User.objects.create_user(
+        cls.unapproved_worker = User.objects.create_user(
             username='unapproved_worker',
             email='unapproved@test.com',
             password='testpass123',
@@ -63,7 +67,7 @@ class DashboardTestCase(TestCase):
             is_approved=False
         )
         
-        self.admin = User.objects.create_user(
+        cls.admin = User.objects.create_user(
             username='admin',
             email='admin@test.com',
             password='testpass123',
@@ -72,64 +76,56 @@ class DashboardTestCase(TestCase):
         )
         
         # Create service requests
-        self.service_request1 = ServiceRequest.objects.create(
-            customer=self.customer1,
-            description='Fix broken water pipe',
-            location='123 Main St',
-            urgency='high',
-            status='open'
-        )
-        
-        self.service_request2 = ServiceRequest.objects.create(
-            customer=self.customer1,
-            description='Install light fixture',
-            location='456 Oak Ave',
-            urgency='medium',
-            status='in_progress',
-            assigned_field_worker=self.field_worker1
-        )
-        
-        self.service_request3 = ServiceRequest.objects.create(
-            customer=self.customer2,
-            description='Replace door handle',
-            location='789 Pine St',
-            urgency='low',
-            status='completed',
-            assigned_field_worker=self.field_worker1
-        )
-        
-        self.service_request4 = ServiceRequest.objects.create(
-            customer=self.customer2,
-            description='Repair window',
-            location='321 Elm St',
-            urgency='high',
-            status='cancelled'
-        )
+        (
+            cls.service_request1,
+            cls.service_request2,
+            cls.service_request3,
+            cls.service_request4,
+        ) = ServiceRequest.objects.bulk_create([
+            ServiceRequest(
+                customer=cls.customer1,
+                description='Fix broken water pipe',
+                location='123 Main St',
+                urgency='high',
+                status='open'
+            ),
+            ServiceRequest(
+                customer=cls.customer1,
+                description='Install light fixture',
+                location='456 Oak Ave',
+                urgency='medium',
+                status='in_progress',
+                assigned_field_worker=cls.field_worker1
+            ),
+            ServiceRequest(
+                customer=cls.customer2,
+                description='Replace door handle',
+                location='789 Pine St',
+                urgency='low',
+                status='completed',
+                assigned_field_worker=cls.field_worker1
+            ),
+            ServiceRequest(
+                customer=cls.customer2,
+                description='Repair window',
+                location='321 Elm St',
+                urgency='high',
+                status='cancelled'
+            ),
+        ])
         
         # Create tasks
-        self.task1 = Task.objects.create(
-            service_request=self.service_request2,
-            assigned_to=self.field_worker1,
-            status='assigned'
-        )
-        
-        self.task2 = Task.objects.create(
-            service_request=self.service_request2,
-            assigned_to=self.field_worker1,
-            status='in_progress'
-        )
-        
-        self.task3 = Task.objects.create(
-            service_request=self.service_request3,
-            assigned_to=self.field_worker1,
-            status='completed'
-        )
-        
-        self.task4 = Task.objects.create(
-            service_request=self.service_request3,
-            assigned_to=self.field_worker2,
-            status='assigned'
-        )
+        cls.task1, cls.task2, cls.task3, cls.task4 = Task.objects.bulk_create([
+            Task(service_request=cls.service_request2, assigned_to=cls.field_worker1, status='assigned'),
+            Task(service_request=cls.service_request2, assigned_to=cls.field_worker1, status='in_progress'),
+            Task(service_request=cls.service_request3, assigned_to=cls.field_worker1, status='completed'),
+            Task(service_request=cls.service_request3, assigned_to=cls.field_worker2, status='assigned'),
+        ])
+    
+    def setUp(self):
+        """Set up a fresh client and cache for each test."""
+        cache.clear()
+        self.client = APIClient()
     
     def get_auth_headers(self, user):
         """Get authentication headers for a user."""
@@ -232,6 +228,7 @@ class DashboardTestCase(TestCase):
         response = self.client.get(url, **headers)
         
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(response.data, {'error': 'Permission denied.'})
     
     def test_worker_summary_dashboard_unauthenticated_access(self):
         """Test that unauthenticated users cannot access worker summary."""
@@ -287,6 +284,7 @@ class DashboardTestCase(TestCase):
         response = self.client.get(url, **headers)
         
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(response.data, {'error': 'Permission denied.'})
     
     def test_customer_summary_dashboard_unauthenticated_access(self):
         """Test that unauthenticated users cannot access customer summary."""
@@ -410,9 +408,12 @@ class DashboardTestCase(TestCase):
     
     def test_dashboard_counts_with_no_data(self):
         """Test dashboard counts when there is no data."""
-        # Delete all data
-        ServiceRequest.objects.all().delete()
-        Task.objects.all().delete()
+        # Delete all data with one DELETE per table. _raw_delete skips the
+        # cascade collector and delete signals, so tasks go first.
+        Task.objects.all()._raw_delete(Task.objects.db)
+        ServiceRequest.objects.all()._raw_delete(ServiceRequest.objects.db)
+        self.assertFalse(Task.objects.exists())
+        self.assertFalse(ServiceRequest.objects.exists())
         
         # Test admin overview
         url = reverse('dashboard:admin_overview')
@@ -504,53 +505,146 @@ class DashboardTestCase(TestCase):
         self.assertEqual(response.data['users_customers'], 2)
     
     def test_dashboard_response_format(self):
-        """Test that dashboard responses have correct format and structure."""
-        # Test admin overview format
+        """Test that the admin overview response matches its serializer."""
         url = reverse('dashboard:admin_overview')
         headers = self.get_auth_headers(self.admin)
         
         response = self.client.get(url, **headers)
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        
-        # Check response structure
-        expected_keys = [
-            'users_total', 'users_admins', 'users_workers', 'users_customers',
-            'service_requests_total', 'service_requests_open', 'service_requests_in_progress', 
-            'service_requests_completed', 'tasks_total', 'tasks_assigned', 
-            'tasks_in_progress', 'tasks_completed'
-        ]
-        
-        for key in expected_keys:
-            self.assertIn(key, response.data)
-            self.assertIsInstance(response.data[key], int)
-        
-        # Test worker summary format
+        self.assertEqual(set(response.data), set(AdminOverviewSerializer().fields))
+        for value in response.data.values():
+            self.assertIsInstance(value, int)
+
+    def test_admin_overview_is_served_from_cache(self):
+        """Test that repeated admin overview requests skip the count queries."""
+        url = reverse('dashboard:admin_overview')
+        headers = self.get_auth_headers(self.admin)
+
+        first = self.client.get(url, **headers)
+
+        # Only the JWT user lookup remains on a cache hit
+        with self.assertNumQueries(1):
+            second = self.client.get(url, **headers)
+
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.data, first.data)
+
+    def test_dashboard_cache_invalidated_on_save(self):
+        """Test that saving related data invalidates cached dashboard counts."""
+        self.client.get(reverse('dashboard:admin_overview'), **self.get_auth_headers(self.admin))
+        self.client.get(reverse('dashboard:worker_summary'), **self.get_auth_headers(self.field_worker2))
+        self.client.get(reverse('dashboard:customer_summary'), **self.get_auth_headers(self.customer2))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.task4.status = 'in_progress'
+            self.task4.save()
+            self.service_request4.status = 'open'
+            self.service_request4.save()
+
+        response = self.client.get(reverse('dashboard:admin_overview'), **self.get_auth_headers(self.admin))
+        self.assertEqual(response.data['tasks_in_progress'], 2)
+        self.assertEqual(response.data['service_requests_open'], 2)
+
+        response = self.client.get(reverse('dashboard:worker_summary'), **self.get_auth_headers(self.field_worker2))
+        self.assertEqual(response.data['assigned'], 0)
+        self.assertEqual(response.data['in_progress'], 1)
+
+        response = self.client.get(reverse('dashboard:customer_summary'), **self.get_auth_headers(self.customer2))
+        self.assertEqual(response.data['requests_open'], 1)
+
+    def test_admin_overview_single_query_matches_orm(self):
+        """Test that the single-statement overview matches the per-table ORM aggregates."""
+        def orm_counts():
+            return {**counts._user_counts(), **counts._service_request_counts(), **counts._task_counts()}
+
+        with self.assertNumQueries(1):
+            data = counts._admin_overview_single_query()
+        self.assertEqual(data, orm_counts())
+
+        Task.objects.all()._raw_delete(Task.objects.db)
+        ServiceRequest.objects.all()._raw_delete(ServiceRequest.objects.db)
+        self.assertEqual(counts._admin_overview_single_query(), orm_counts())
+
+    def test_dashboard_cache_kept_until_commit(self):
+        """Test that cached counts are only dropped once the write commits."""
+        url = reverse('dashboard:admin_overview')
+        headers = self.get_auth_headers(self.admin)
+        self.client.get(url, **headers)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.task4.delete()
+
+        self.assertEqual(self.client.get(url, **headers).data['tasks_total'], 4)
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.client.get(url, **headers).data['tasks_total'], 3)
+
+    def test_refresh_dashboard_cache_command(self):
+        """Test that the refresh command precomputes the admin overview."""
+        call_command('refresh_dashboard_cache', stdout=StringIO())
+
+        url = reverse('dashboard:admin_overview')
+        headers = self.get_auth_headers(self.admin)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['users_total'], 6)
+        self.assertEqual(response.data['tasks_total'], 4)
+    
+    def test_dashboard_etag_not_modified(self):
+        """Test that a matching If-None-Match returns 304 until the counts change."""
         url = reverse('dashboard:worker_summary')
         headers = self.get_auth_headers(self.field_worker1)
-        
+
         response = self.client.get(url, **headers)
-        
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        
-        # Check response structure
-        expected_keys = ['assigned', 'in_progress', 'completed']
-        
-        for key in expected_keys:
-            self.assertIn(key, response.data)
-            self.assertIsInstance(response.data[key], int)
-        
-        # Test customer summary format
-        url = reverse('dashboard:customer_summary')
-        headers = self.get_auth_headers(self.customer1)
-        
-        response = self.client.get(url, **headers)
-        
+        etag = response['ETag']
+        self.assertIn('Authorization', response['Vary'])
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag, **headers)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.task1.status = 'in_progress'
+            self.task1.save()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag, **headers)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        
-        # Check response structure
-        expected_keys = ['requests_total', 'requests_open', 'requests_in_progress', 'requests_completed']
-        
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.data['in_progress'], 2)
+
+
+class DashboardSerializerFormatTestCase(SimpleTestCase):
+    """Response shape checks for the dashboard serializers; no database needed."""
+
+    def assertIntegerSerializer(self, serializer_class, expected_keys):
+        fields = serializer_class().fields
+        self.assertEqual(set(fields), set(expected_keys))
         for key in expected_keys:
-            self.assertIn(key, response.data)
-            self.assertIsInstance(response.data[key], int)
+            self.assertIsInstance(fields[key], serializers.IntegerField)
+
+        data = serializer_class(dict.fromkeys(expected_keys, 0)).data
+        self.assertEqual(data, dict.fromkeys(expected_keys, 0))
+
+    def test_admin_overview_serializer_format(self):
+        """Test admin overview serializer fields."""
+        self.assertIntegerSerializer(AdminOverviewSerializer, [
+            'users_total', 'users_admins', 'users_workers', 'users_customers',
+            'service_requests_total', 'service_requests_open', 'service_requests_in_progress',
+            'service_requests_completed', 'tasks_total', 'tasks_assigned',
+            'tasks_in_progress', 'tasks_completed'
+        ])
+
+    def test_worker_summary_serializer_format(self):
+        """Test worker summary serializer fields."""
+        self.assertIntegerSerializer(WorkerSummarySerializer, ['assigned', 'in_progress', 'completed'])
+
+    def test_customer_summary_serializer_format(self):
+        """Test customer summary serializer fields."""
+        self.assertIntegerSerializer(CustomerSummarySerializer, [
+            'requests_total', 'requests_open', 'requests_in_progress', 'requests_completed'
+        ])
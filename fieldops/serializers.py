@@ -0,0 +1,212 @@
+import copy
+import operator
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework.fields import BooleanField, CharField, ChoiceField, IntegerField
+from rest_framework.relations import ManyRelatedField, PrimaryKeyRelatedField
+from rest_framework.serializers import BaseSerializer
+
+
+class CachedFieldsMixin:
+    """
+    Build the ModelSerializer field map once per class and hand each
+    instance shallow copies, instead of re-introspecting the model and
+    deep-copying declared fields on every instantiation.
+    """
+
+    def get_fields(self):
+        cls = type(self)
+        prototype = cls.__dict__.get('_fields_prototype')
+        if prototype is None:
+            prototype = super().get_fields()
+            cls._fields_prototype = prototype
+        return {name: copy.copy(field) for name, field in prototype.items()}
+
+
+# Fields whose output is the attribute value itself
+_PASSTHROUGH_FIELDS = (BooleanField, CharField, ChoiceField, IntegerField)
+
+
+class FlatRowRepresentationMixin:
+    """
+    Render a ModelSerializer row by reading every attribute with one
+    attrgetter, derived from the readable fields once per class, and
+    formatting only the fields whose output differs from the attribute
+    (dates and the like). Serializers with a field that isn't a plain column
+    keep DRF's field-by-field representation.
+    """
+
+    def _flat_row_plan(self):
+        cls = type(self)
+        if '_flat_row' in cls.__dict__:
+            return cls._flat_row
+
+        # The rendered fields in output order, whatever Meta uses to pick them
+        fields = list(self._readable_fields)
+        paths = [_flat_attr_path(cls.Meta.model, field) for field in fields]
+        if not fields or None in paths:
+            plan = None
+        else:
+            names = tuple(field.field_name for field in fields)
+            formatted = tuple(field.field_name for field in fields if not _renders_unchanged(field))
+            plan = (names, operator.attrgetter(*paths), formatted)
+        cls._flat_row = plan
+        return plan
+
+    def to_representation(self, instance):
+        plan = self._flat_row_plan()
+        if plan is None:
+            return super().to_representation(instance)
+        names, getter, formatted = plan
+        values = getter(instance)
+        if len(names) == 1:
+            values = (values,)
+        data = dict(zip(names, values))
+        for name in formatted:
+            if data[name] is not None:
+                data[name] = self.fields[name].to_representation(data[name])
+        return data
+
+
+def _renders_unchanged(field):
+    if isinstance(field, PrimaryKeyRelatedField):
+        return field.pk_field is None
+    return isinstance(field, _PASSTHROUGH_FIELDS)
+
+
+def _flat_attr_path(model, field):
+    """
+    Dotted attribute path holding a field's value on a row, with related
+    fields read from their key column; None unless every step is a concrete
+    column or a non-null forward relation.
+    """
+    if field.source == '*' or isinstance(field, (BaseSerializer, ManyRelatedField)):
+        return None
+    attrs = list(field.source_attrs)
+    for index, attr in enumerate(attrs):
+        try:
+            model_field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            return None
+        if not model_field.concrete:
+            return None
+        if index < len(attrs) - 1:
+            if not (model_field.many_to_one or model_field.one_to_one) or model_field.null:
+                return None
+            model = model_field.related_model
+    if isinstance(field, PrimaryKeyRelatedField):
+        attrs[-1] = model_field.attname
+    return '.'.join(attrs)
+
+
+class UpdateFieldsMixin:
+    """
+    Write only the columns an update sets, plus auto_now timestamps,
+    instead of rewriting every column of the row.
+    """
+
+    def update(self, instance, validated_data):
+        opts = instance._meta
+        if any(opts.get_field(name).many_to_many for name in validated_data):
+            return super().update(instance, validated_data)
+        for name, value in validated_data.items():
+            setattr(instance, name, value)
+        timestamps = [f.name for f in opts.concrete_fields if getattr(f, 'auto_now', False)]
+        instance.save(update_fields=[*validated_data, *timestamps])
+        return instance
+
+
+def related_paths(serializer_class):
+    """
+    (select_related, prefetch_related) paths that a ModelSerializer's
+    fields traverse, worked out from their sources once per class.
+    """
+    cached = serializer_class.__dict__.get('_related_paths')
+    if cached is not None:
+        return cached
+
+    select, prefetch = set(), set()
+    for field in serializer_class().fields.values():
+        if field.source == '*':
+            continue
+        # Nested serializers and many-related fields read the relation itself;
+        # other fields only read through the relations before their last attr
+        nested = isinstance(field, (BaseSerializer, ManyRelatedField))
+        attrs = field.source_attrs if nested else field.source_attrs[:-1]
+        model, path, many = serializer_class.Meta.model, [], False
+        for attr in attrs:
+            try:
+                model_field = model._meta.get_field(attr)
+            except FieldDoesNotExist:
+                break
+            if not model_field.is_relation:
+                break
+            path.append(attr)
+            many = many or model_field.many_to_many or model_field.one_to_many
+            model = model_field.related_model
+        if path:
+            (prefetch if many else select).add('__'.join(path))
+
+    cached = (tuple(sorted(select)), tuple(sorted(prefetch)))
+    serializer_class._related_paths = cached
+    return cached
+
+
+def _column_path(model, source_attrs):
+    """
+    only() path for a field source: '' when a to-many relation supplies it
+    (prefetched separately), None when it isn't backed by a model field.
+    """
+    path = []
+    for attr in source_attrs:
+        try:
+            model_field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            return None
+        if model_field.many_to_many or model_field.one_to_many:
+            return ''
+        path.append(model_field.name)
+        if not model_field.is_relation:
+            break
+        model = model_field.related_model
+    return '__'.join(path)
+
+
+def loaded_columns(serializer_class):
+    """
+    Field paths for QuerySet.only() covering every column a ModelSerializer
+    reads, worked out once per class; None if any source is computed.
+    """
+    if '_loaded_columns' in serializer_class.__dict__:
+        return serializer_class._loaded_columns
+
+    model = serializer_class.Meta.model
+    columns = {model._meta.pk.name}
+    for field in serializer_class().fields.values():
+        path = None if field.source == '*' else _column_path(model, field.source_attrs)
+        if path is None:
+            columns = None
+            break
+        if path:
+            columns.add(path)
+
+    serializer_class._loaded_columns = None if columns is None else tuple(sorted(columns))
+    return serializer_class._loaded_columns
+
+
+def optimize_queryset(queryset, serializer_class, trim_columns=False):
+    """
+    Apply the related paths a serializer needs to a queryset of its model.
+    With trim_columns, also limit the SELECT to the columns it reads; only
+    for rows that are rendered and not saved or checked against other fields.
+    """
+    if getattr(getattr(serializer_class, 'Meta', None), 'model', None) is not queryset.model:
+        return queryset
+    select, prefetch = related_paths(serializer_class)
+    if select:
+        queryset = queryset.select_related(*select)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    if trim_columns and loaded_columns(serializer_class) is not None:
+        queryset = queryset.only(*loaded_columns(serializer_class))
+    return queryset
@@ -88,10 +88,37 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Reuse each worker's connection across requests instead of reopening it
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', '60')),
     }
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Seconds dashboard counts are served from cache before being recomputed
+DASHBOARD_CACHE_TIMEOUT = int(os.getenv('DASHBOARD_CACHE_TIMEOUT', '30'))
+
+# Run the admin overview aggregates concurrently, one DB connection each.
+# Leave off on SQLite, which serialises access to the database file.
+DASHBOARD_PARALLEL_AGGREGATES = os.getenv('DASHBOARD_PARALLEL_AGGREGATES', 'False') == 'True'
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -0,0 +1,101 @@
+"""
+Test cases for the shared serializer machinery in fieldops.serializers.
+"""
+from django.test import SimpleTestCase
+from django.utils import timezone
+from rest_framework import serializers
+from fieldops.serializers import FlatRowRepresentationMixin, loaded_columns, related_paths
+from service_requests.models import ServiceRequest
+from service_requests.serializers import ServiceRequestDetailSerializer, ServiceRequestListSerializer
+from tasks.serializers import TaskListSerializer
+
+
+class SerializerRelatedPathsTestCase(SimpleTestCase):
+    """Test the joins derived from serializer field sources."""
+    
+    def test_dotted_sources_become_select_related_paths(self):
+        """Test that fields read through a foreign key select that relation."""
+        self.assertEqual(related_paths(TaskListSerializer), (('service_request',), ()))
+    
+    def test_id_sources_need_no_joins(self):
+        """Test that serializers reading only FK ids derive no related paths."""
+        self.assertEqual(related_paths(ServiceRequestListSerializer), ((), ()))
+        self.assertEqual(related_paths(ServiceRequestDetailSerializer), ((), ()))
+    
+    def test_list_columns_cover_only_rendered_fields(self):
+        """Test that the list serializer's columns leave out what it never reads."""
+        self.assertEqual(
+            loaded_columns(ServiceRequestListSerializer),
+            ('assigned_field_worker', 'created_at', 'description', 'id', 'location', 'rating', 'status', 'urgency')
+        )
+
+
+class AllFieldsSerializer(FlatRowRepresentationMixin, serializers.ModelSerializer):
+    class Meta:
+        model = ServiceRequest
+        fields = '__all__'
+
+
+class ExcludeSerializer(FlatRowRepresentationMixin, serializers.ModelSerializer):
+    class Meta:
+        model = ServiceRequest
+        exclude = ('customer', 'assigned_field_worker')
+
+
+class WriteOnlySerializer(FlatRowRepresentationMixin, serializers.ModelSerializer):
+    class Meta:
+        model = ServiceRequest
+        fields = ('id', 'description', 'location')
+        extra_kwargs = {'location': {'write_only': True}}
+
+
+class MethodFieldSerializer(FlatRowRepresentationMixin, serializers.ModelSerializer):
+    summary = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = ServiceRequest
+        fields = ('id', 'summary')
+    
+    def get_summary(self, obj):
+        return f'{obj.urgency}: {obj.description}'
+
+
+class FlatRowRepresentationTestCase(SimpleTestCase):
+    """Test the one-attrgetter row rendering against DRF's field-by-field output."""
+    
+    def setUp(self):
+        self.service_request = ServiceRequest(
+            id=3, customer_id=4, assigned_field_worker_id=5, description='Fix broken water pipe',
+            location='123 Main St', urgency='high', status='open', rating=4,
+            created_at=timezone.now(), updated_at=timezone.now()
+        )
+    
+    def assert_matches_default_representation(self, serializer_class):
+        serializer = serializer_class()
+        # Every readable field flattens, so the row is read with the one attrgetter
+        self.assertIsNotNone(serializer._flat_row_plan())
+        expected = serializers.ModelSerializer.to_representation(serializer, self.service_request)
+        self.assertEqual(serializer.to_representation(self.service_request), dict(expected))
+    
+    def test_all_fields_render_as_drf_would(self):
+        """Test that fields = '__all__' flattens every model field, foreign keys as ids."""
+        self.assert_matches_default_representation(AllFieldsSerializer)
+    
+    def test_exclude_renders_as_drf_would(self):
+        """Test that serializers picking fields with exclude flatten the remaining fields."""
+        self.assert_matches_default_representation(ExcludeSerializer)
+    
+    def test_write_only_fields_are_not_rendered(self):
+        """Test that write-only fields stay out of the flattened row."""
+        self.assert_matches_default_representation(WriteOnlySerializer)
+        self.assertNotIn('location', WriteOnlySerializer().to_representation(self.service_request))
+    
+    def test_computed_fields_fall_back_to_drf(self):
+        """Test that a serializer with a method field keeps DRF's representation."""
+        serializer = MethodFieldSerializer()
+        
+        self.assertIsNone(serializer._flat_row_plan())
+        self.assertEqual(
+            serializer.to_representation(self.service_request),
+            {'id': 3, 'summary': 'high: Fix broken water pipe'}
+        )
@@ -0,0 +1,8 @@
+"""
+Settings for running the test suite; `manage.py test` selects this module.
+"""
+
+from .settings import *  # noqa: F401,F403
+
+# The test suite creates many users; a cheap hasher keeps fixtures fast
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
@@ -16,13 +16,17 @@ schema_view = get_schema_view(
     permission_classes=(permissions.AllowAny,),
 )
 
+# The schema is generated lazily on the docs request; cache it outside
+# development so repeated hits don't re-introspect every view.
+SCHEMA_CACHE_TIMEOUT = 0 if settings.DEBUG else 60 * 60
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/users/', include('users.urls')),
     path('api/service-requests/', include('service_requests.urls')),
     path('api/tasks/', include('tasks.urls')),
     path('api/dashboard/', include('dashboard.urls')),
-    path('api/docs/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
+    path('api/docs/', schema_view.with_ui('swagger', cache_timeout=SCHEMA_CACHE_TIMEOUT), name='schema-swagger-ui'),
 ]
 
 if settings.DEBUG:
@@ -6,7 +6,10 @@ import sys
 
 def main():
     """Run administrative tasks."""
-    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fieldops.settings')
+    # The test command gets its own settings module; every other command,
+    # whatever its arguments, runs with the real ones
+    settings_module = 'fieldops.test_settings' if sys.argv[1:2] == ['test'] else 'fieldops.settings'
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
     try:
         from django.core.management import execute_from_command_line
     except ImportError as exc:
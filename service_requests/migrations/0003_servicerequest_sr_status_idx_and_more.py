@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-15 03:06
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('service_requests', '0002_servicerequest_assigned_field_worker'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='servicerequest',
+            index=models.Index(fields=['status'], name='sr_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='servicerequest',
+            index=models.Index(fields=['customer', 'status'], name='sr_customer_status_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-15 03:18
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('service_requests', '0003_servicerequest_sr_status_idx_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='servicerequest',
+            index=models.Index(fields=['-created_at'], name='sr_created_at_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.6 on 2026-10-15 03:21
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('service_requests', '0004_servicerequest_sr_created_at_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='servicerequest',
+            name='sr_status_idx',
+        ),
+        migrations.AddIndex(
+            model_name='servicerequest',
+            index=models.Index(condition=models.Q(('status__in', ['open', 'in_progress', 'completed'])), fields=['status'], name='sr_active_status_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='servicerequest',
+            constraint=models.CheckConstraint(condition=models.Q(('status__in', ['open', 'in_progress', 'completed', 'cancelled'])), name='sr_status_valid'),
+        ),
+    ]
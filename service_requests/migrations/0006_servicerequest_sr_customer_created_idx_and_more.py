@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-15 03:52
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('service_requests', '0005_remove_servicerequest_sr_status_idx_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='servicerequest',
+            index=models.Index(fields=['customer', '-created_at'], name='sr_customer_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='servicerequest',
+            index=models.Index(fields=['assigned_field_worker', 'status'], name='sr_worker_status_idx'),
+        ),
+    ]
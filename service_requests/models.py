@@ -51,6 +51,23 @@ class ServiceRequest(models.Model):
     class Meta:
         db_table = "service_requests"
         ordering = ("-created_at",)
+        indexes = [
+            models.Index(
+                fields=["status"],
+                name="sr_active_status_idx",
+                condition=models.Q(status__in=["open", "in_progress", "completed"]),
+            ),
+            models.Index(fields=["customer", "status"], name="sr_customer_status_idx"),
+            models.Index(fields=["-created_at"], name="sr_created_at_idx"),
+            models.Index(fields=["customer", "-created_at"], name="sr_customer_created_idx"),
+            models.Index(fields=["assigned_field_worker", "status"], name="sr_worker_status_idx"),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(status__in=["open", "in_progress", "completed", "cancelled"]),
+                name="sr_status_valid",
+            ),
+        ]
 
     def __str__(self) -> str:
         return f"Request #{self.id} by {self.customer_id} ({self.status})"
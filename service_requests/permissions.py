@@ -1,15 +1,29 @@
 from rest_framework.permissions import BasePermission
 
+from users.permissions import user_flags
+from .models import ServiceRequest
+
 
 class IsOwnerOrAdmin(BasePermission):
-    """Allow edits only by the request owner (customer) or admin users."""
+    """
+    Allow edits only by the request owner (customer) or admin users.
+    Only used with ServiceRequest objects, so `customer_id` is read directly.
+    """
+
+    def has_object_permission(self, request, view, obj: ServiceRequest):
+        assert isinstance(obj, ServiceRequest), 'IsOwnerOrAdmin only applies to ServiceRequest objects.'
+        flags = user_flags(request)
+        # Role flags come from the request memo; the ownership test is a
+        # single int compare, cheaper than caching its result
+        return flags.is_admin or (flags.is_authenticated and obj.customer_id == request.user.id)
 
-    def has_object_permission(self, request, view, obj):
-        user = request.user
-        if not user or not user.is_authenticated:
-            return False
-        if getattr(user, "is_admin", False):
-            return True
-        return getattr(obj, 'customer_id', None) == getattr(user, 'id', None)
 
+class IsCustomerToCreate(BasePermission):
+    """
+    Only customers may create service requests; checked before the payload
+    is parsed or validated.
+    """
+    message = 'Only customers can create service requests.'
 
+    def has_permission(self, request, view):
+        return view.action != 'create' or user_flags(request).is_customer
@@ -1,11 +1,13 @@
+from django.contrib.auth import get_user_model
 from rest_framework import serializers
+from fieldops.serializers import CachedFieldsMixin, FlatRowRepresentationMixin
 from .models import ServiceRequest
 
+User = get_user_model()
 
 
-
-class ServiceRequestListSerializer(serializers.ModelSerializer):
-    assigned_field_worker = serializers.PrimaryKeyRelatedField(read_only=True)
+class ServiceRequestListSerializer(CachedFieldsMixin, FlatRowRepresentationMixin, serializers.ModelSerializer):
+    assigned_field_worker = serializers.IntegerField(source='assigned_field_worker_id', read_only=True)
     
     class Meta:
         model = ServiceRequest
@@ -16,9 +18,9 @@ class ServiceRequestListSerializer(serializers.ModelSerializer):
         read_only_fields = ('id', 'assigned_field_worker', 'status', 'rating', 'created_at')
 
 
-class ServiceRequestDetailSerializer(serializers.ModelSerializer):
-    customer = serializers.PrimaryKeyRelatedField(read_only=True)
-    assigned_field_worker = serializers.PrimaryKeyRelatedField(read_only=True)
+class ServiceRequestDetailSerializer(CachedFieldsMixin, serializers.ModelSerializer):
+    customer = serializers.IntegerField(source='customer_id', read_only=True)
+    assigned_field_worker = serializers.IntegerField(source='assigned_field_worker_id', read_only=True)
 
     class Meta:
         model = ServiceRequest
@@ -31,32 +33,33 @@ class ServiceRequestDetailSerializer(serializers.ModelSerializer):
         )
 
 
-class ServiceRequestCreateUpdateSerializer(serializers.ModelSerializer):
+class ServiceRequestCreateUpdateSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = ServiceRequest
         fields = ('description', 'location', 'urgency')
 
     def create(self, validated_data):
-        request = self.context.get('request')
-        customer = getattr(request, 'user', None)
-        return ServiceRequest.objects.create(customer=customer, **validated_data)
+        # The view has already resolved request.user for its permission
+        # checks, so pass the id and skip the FK descriptor on the instance
+        user = self.context['request'].user
+        return ServiceRequest.objects.create(customer_id=user.pk, **validated_data)
 
     def validate(self, attrs):
         # Keep validation minimal and practical
         return attrs
 
 
-class ServiceRequestRatingSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = ServiceRequest
-        fields = ('rating',)
-
-    def validate_rating(self, value: int):
-        if value is None:
-            return value
-        if not 1 <= value <= 5:
-            raise serializers.ValidationError('Rating must be between 1 and 5.')
-        return value
+class ServiceRequestRatingSerializer(serializers.Serializer):
+    rating = serializers.IntegerField(
+        min_value=1,
+        max_value=5,
+        allow_null=True,
+        required=False,
+        error_messages={
+            'min_value': 'Rating must be between 1 and 5.',
+            'max_value': 'Rating must be between 1 and 5.',
+        },
+    )
 
 
 class ServiceRequestAssignmentSerializer(serializers.ModelSerializer):
@@ -74,18 +77,46 @@ class ServiceRequestAssignmentSerializer(serializers.ModelSerializer):
         if value is None:
             return value
         
-        from django.contrib.auth import get_user_model
-        User = get_user_model()
-        
-        try:
-            user = User.objects.get(id=value)
-        except User.DoesNotExist:
+        # Read the two columns fresh on every assignment, so approving or
+        # rejecting a worker applies at once in every process
+        row = User.objects.filter(pk=value).values_list('role', 'is_approved').first()
+        if row is None:
             raise serializers.ValidationError('User does not exist.')
-        
-        if not user.is_field_worker:
+        role, is_approved = row
+        if role != 'field_worker':
             raise serializers.ValidationError('User must be a field worker.')
-        if not user.is_approved:
+        if not is_approved:
             raise serializers.ValidationError('Field worker must be approved.')
         return value
 
 
+class BulkAssignmentListSerializer(serializers.ListSerializer):
+    """Validate every row of a bulk assignment with one query per table."""
+
+    def validate(self, attrs):
+        request_ids = [row['service_request'] for row in attrs]
+        if len(set(request_ids)) != len(request_ids):
+            raise serializers.ValidationError('Each service request may appear only once.')
+        
+        found = set(ServiceRequest.objects.filter(pk__in=request_ids).values_list('id', flat=True))
+        missing = sorted(set(request_ids) - found)
+        if missing:
+            raise serializers.ValidationError(f'Service requests not found: {missing}.')
+        
+        worker_ids = {row['assigned_field_worker'] for row in attrs}
+        approved = set(
+            User.objects.field_workers().filter(id__in=worker_ids, is_approved=True)
+            .values_list('id', flat=True)
+        )
+        invalid = sorted(worker_ids - approved)
+        if invalid:
+            raise serializers.ValidationError(f'Users are not approved field workers: {invalid}.')
+        return attrs
+
+
+class ServiceRequestBulkAssignmentSerializer(serializers.Serializer):
+    service_request = serializers.IntegerField(help_text="ID of the service request to assign")
+    assigned_field_worker = serializers.IntegerField(help_text="ID of the field worker to assign")
+    
+    class Meta:
+        list_serializer_class = BulkAssignmentListSerializer
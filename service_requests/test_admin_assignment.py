@@ -2,13 +2,14 @@
 Test cases for admin task assignment functionality.
 Tests admin assigning service requests to field workers and creating tasks.
 """
-import json
+from django.core.cache import cache
 from django.test import TestCase
 from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
 from django.contrib.auth import get_user_model
-from rest_framework_simplejwt.tokens import RefreshToken
+from django.contrib.auth.hashers import make_password
+from dashboard.cache import ADMIN_OVERVIEW_KEY, customer_summary_key, worker_summary_key
 from .models import ServiceRequest
 from tasks.models import Task
 
@@ -18,77 +19,44 @@ User = get_user_model()
 class AdminTaskAssignmentTestCase(TestCase):
     """Test cases for admin task assignment functionality."""
     
-    def setUp(self):
-        """Set up test data."""
-        self.client = APIClient()
-        
-        # Create test users
-        self.customer = User.objects.create_user(
-            username='testcustomer',
-            email='customer@test.com',
-            password='testpass123',
-            role='customer',
-            is_approved=True
-        )
-        
-        self.field_worker = User.objects.create_user(
-            username='testworker',
-            email='worker@test.com',
-            password='testpass123',
-            role='field_worker',
-            is_approved=True
-        )
-        
-        self.unapproved_worker = User.objects.create_user(
-            username='unapprovedworker',
-            email='unapproved@test.com',
-            password='testpass123',
-            role='field_worker',
-            is_approved=False
-        )
-        
-        self.admin = User.objects.create_user(
-            username='testadmin',
-            email='admin@test.com',
-            password='testpass123',
-            role='admin',
-            is_approved=True
-        )
+    client_class = APIClient
+    
+    @classmethod
+    def setUpTestData(cls):
+        """Set up test data shared by every test in the class."""
+        # Create test users in one INSERT; tests log in with
+        # force_authenticate, so the passwords are never checked and one
+        # shared hash serves every user
+        password = make_password('testpass123')
+        cls.customer, cls.field_worker, cls.unapproved_worker, cls.admin = User.objects.bulk_create([
+            User(username='testcustomer', email='customer@test.com', password=password,
+                 role='customer', is_approved=True),
+            User(username='testworker', email='worker@test.com', password=password,
+                 role='field_worker', is_approved=True),
+            User(username='unapprovedworker', email='unapproved@test.com', password=password,
+                 role='field_worker', is_approved=False),
+            User(username='testadmin', email='admin@test.com', password=password,
+                 role='admin', is_approved=True),
+        ])
         
         # Create service requests
-        self.service_request = ServiceRequest.objects.create(
-            customer=self.customer,
-            description='Fix broken water pipe',
-            location='123 Main St, City, State',
-            urgency='high',
-            status='open'
-        )
-        
-        self.service_request_in_progress = ServiceRequest.objects.create(
-            customer=self.customer,
-            description='Install new light fixture',
-            location='456 Oak Ave, City, State',
-            urgency='medium',
-            status='in_progress'
-        )
-        
-        self.service_request_completed = ServiceRequest.objects.create(
-            customer=self.customer,
-            description='Replace door handle',
-            location='789 Pine St, City, State',
-            urgency='low',
-            status='completed'
-        )
-    
-    def get_auth_headers(self, user):
-        """Get authentication headers for a user."""
-        refresh = RefreshToken.for_user(user)
-        return {'HTTP_AUTHORIZATION': f'Bearer {str(refresh.access_token)}'}
+        (
+            cls.service_request,
+            cls.service_request_in_progress,
+            cls.service_request_completed,
+        ) = ServiceRequest.objects.bulk_create([
+            ServiceRequest(customer=cls.customer, description='Fix broken water pipe',
+                           location='123 Main St, City, State', urgency='high', status='open'),
+            ServiceRequest(customer=cls.customer, description='Install new light fixture',
+                           location='456 Oak Ave, City, State', urgency='medium', status='in_progress'),
+            ServiceRequest(customer=cls.customer, description='Replace door handle',
+                           location='789 Pine St, City, State', urgency='low', status='completed'),
+        ])
     
     def test_admin_can_assign_service_request_to_approved_worker(self):
         """Test that admin can assign service request to approved field worker."""
         url = reverse('service-request-assign', kwargs={'pk': self.service_request.id})
-        headers = self.get_auth_headers(self.admin)
+        self.client.force_authenticate(user=self.admin)
         
         assignment_data = {
             'assigned_field_worker': self.field_worker.id
@@ -96,9 +64,8 @@ class AdminTaskAssignmentTestCase(TestCase):
         
         response = self.client.post(
             url,
-            data=json.dumps(assignment_data),
-            content_type='application/json',
-            **headers
+            data=assignment_data,
+            format='json'
         )
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -118,7 +85,7 @@ class AdminTaskAssignmentTestCase(TestCase):
     def test_admin_cannot_assign_to_unapproved_worker(self):
         """Test that admin cannot assign service request to unapproved field worker."""
         url = reverse('service-request-assign', kwargs={'pk': self.service_request.id})
-        headers = self.get_auth_headers(self.admin)
+        self.client.force_authenticate(user=self.admin)
         
         assignment_data = {
             'assigned_field_worker': self.unapproved_worker.id
@@ -126,18 +93,17 @@ class AdminTaskAssignmentTestCase(TestCase):
         
         response = self.client.post(
             url,
-            data=json.dumps(assignment_data),
-            content_type='application/json',
-            **headers
+            data=assignment_data,
+            format='json'
         )
         
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertIn('Field worker must be approved', str(response.data))
+        self.assertEqual(response.data['assigned_field_worker'], ['Field worker must be approved.'])
     
     def test_admin_cannot_assign_to_customer(self):
         """Test that admin cannot assign service request to customer."""
         url = reverse('service-request-assign', kwargs={'pk': self.service_request.id})
-        headers = self.get_auth_headers(self.admin)
+        self.client.force_authenticate(user=self.admin)
         
         assignment_data = {
             'assigned_field_worker': self.customer.id
@@ -145,18 +111,17 @@ class AdminTaskAssignmentTestCase(TestCase):
         
         response = self.client.post(
             url,
-            data=json.dumps(assignment_data),
-            content_type='application/json',
-            **headers
+            data=assignment_data,
+            format='json'
         )
         
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertIn('User must be a field worker', str(response.data))
+        self.assertEqual(response.data['assigned_field_worker'], ['User must be a field worker.'])
     
     def test_admin_cannot_assign_to_nonexistent_user(self):
         """Test that admin cannot assign service request to nonexistent user."""
         url = reverse('service-request-assign', kwargs={'pk': self.service_request.id})
-        headers = self.get_auth_headers(self.admin)
+        self.client.force_authenticate(user=self.admin)
         
         assignment_data = {
             'assigned_field_worker': 99999  # Nonexistent user ID
@@ -164,13 +129,12 @@ class AdminTaskAssignmentTestCase(TestCase):
         
         response = self.client.post(
             url,
-            data=json.dumps(assignment_data),
-            content_type='application/json',
-            **headers
+            data=assignment_data,
+            format='json'
         )
         
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertIn('User does not exist', str(response.data))
+        self.assertEqual(response.data['assigned_field_worker'], ['User does not exist.'])
     
     def test_admin_can_reassign_service_request(self):
         """Test that admin can reassign service request to different worker."""
@@ -189,7 +153,7 @@ class AdminTaskAssignmentTestCase(TestCase):
         )
         
         url = reverse('service-request-assign', kwargs={'pk': self.service_request.id})
-        headers = self.get_auth_headers(self.admin)
+        self.client.force_authenticate(user=self.admin)
         
         assignment_data = {
             'assigned_field_worker': another_worker.id
@@ -197,9 +161,8 @@ class AdminTaskAssignmentTestCase(TestCase):
         
         response = self.client.post(
             url,
-            data=json.dumps(assignment_data),
-            content_type='application/json',
-            **headers
+            data=assignment_data,
+            format='json'
         )
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -217,7 +180,7 @@ class AdminTaskAssignmentTestCase(TestCase):
         self.service_request.save()
         
         url = reverse('service-request-assign', kwargs={'pk': self.service_request.id})
-        headers = self.get_auth_headers(self.admin)
+        self.client.force_authenticate(user=self.admin)
         
         assignment_data = {
             'assigned_field_worker': None
@@ -225,9 +188,8 @@ class AdminTaskAssignmentTestCase(TestCase):
         
         response = self.client.post(
             url,
-            data=json.dumps(assignment_data),
-            content_type='application/json',
-            **headers
+            data=assignment_data,
+            format='json'
         )
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -240,7 +202,7 @@ class AdminTaskAssignmentTestCase(TestCase):
     def test_customer_cannot_assign_service_request(self):
         """Test that customers cannot assign service requests."""
         url = reverse('service-request-assign', kwargs={'pk': self.service_request.id})
-        headers = self.get_auth_headers(self.customer)
+        self.client.force_authenticate(user=self.customer)
         
         assignment_data = {
             'assigned_field_worker': self.field_worker.id
@@ -248,18 +210,17 @@ class AdminTaskAssignmentTestCase(TestCase):
         
         response = self.client.post(
             url,
-            data=json.dumps(assignment_data),
-            content_type='application/json',
-            **headers
+            data=assignment_data,
+            format='json'
         )
         
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
-        self.assertIn('Only admins can assign service requests', str(response.data))
+        self.assertEqual(response.data['detail'], 'Only admins can assign service requests.')
     
     def test_field_worker_cannot_assign_service_request(self):
         """Test that field workers cannot assign service requests."""
         url = reverse('service-request-assign', kwargs={'pk': self.service_request.id})
-        headers = self.get_auth_headers(self.field_worker)
+        self.client.force_authenticate(user=self.field_worker)
         
         assignment_data = {
             'assigned_field_worker': self.field_worker.id
@@ -267,13 +228,12 @@ class AdminTaskAssignmentTestCase(TestCase):
         
         response = self.client.post(
             url,
-            data=json.dumps(assignment_data),
-            content_type='application/json',
-            **headers
+            data=assignment_data,
+            format='json'
         )
         
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
-        self.assertIn('Only admins can assign service requests', str(response.data))
+        self.assertEqual(response.data['detail'], 'Only admins can assign service requests.')
     
     def test_unauthenticated_user_cannot_assign_service_request(self):
         """Test that unauthenticated users cannot assign service requests."""
@@ -285,8 +245,8 @@ class AdminTaskAssignmentTestCase(TestCase):
         
         response = self.client.post(
             url,
-            data=json.dumps(assignment_data),
-            content_type='application/json'
+            data=assignment_data,
+            format='json'
         )
         
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -294,7 +254,7 @@ class AdminTaskAssignmentTestCase(TestCase):
     def test_assignment_creates_task_for_worker(self):
         """Test that assignment creates a task for the field worker."""
         url = reverse('service-request-assign', kwargs={'pk': self.service_request.id})
-        headers = self.get_auth_headers(self.admin)
+        self.client.force_authenticate(user=self.admin)
         
         assignment_data = {
             'assigned_field_worker': self.field_worker.id
@@ -302,9 +262,8 @@ class AdminTaskAssignmentTestCase(TestCase):
         
         response = self.client.post(
             url,
-            data=json.dumps(assignment_data),
-            content_type='application/json',
-            **headers
+            data=assignment_data,
+            format='json'
         )
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -339,7 +298,7 @@ class AdminTaskAssignmentTestCase(TestCase):
         )
         
         url = reverse('service-request-assign', kwargs={'pk': self.service_request.id})
-        headers = self.get_auth_headers(self.admin)
+        self.client.force_authenticate(user=self.admin)
         
         assignment_data = {
             'assigned_field_worker': another_worker.id
@@ -347,9 +306,8 @@ class AdminTaskAssignmentTestCase(TestCase):
         
         response = self.client.post(
             url,
-            data=json.dumps(assignment_data),
-            content_type='application/json',
-            **headers
+            data=assignment_data,
+            format='json'
         )
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -370,7 +328,7 @@ class AdminTaskAssignmentTestCase(TestCase):
         self.service_request.save()
         
         url = reverse('service-request-assign', kwargs={'pk': self.service_request.id})
-        headers = self.get_auth_headers(self.admin)
+        self.client.force_authenticate(user=self.admin)
         
         assignment_data = {
             'assigned_field_worker': self.field_worker.id
@@ -378,9 +336,8 @@ class AdminTaskAssignmentTestCase(TestCase):
         
         response = self.client.post(
             url,
-            data=json.dumps(assignment_data),
-            content_type='application/json',
-            **headers
+            data=assignment_data,
+            format='json'
         )
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -406,7 +363,7 @@ class AdminTaskAssignmentTestCase(TestCase):
         )
         
         url = reverse('service-request-assign', kwargs={'pk': self.service_request_in_progress.id})
-        headers = self.get_auth_headers(self.admin)
+        self.client.force_authenticate(user=self.admin)
         
         assignment_data = {
             'assigned_field_worker': another_worker.id
@@ -414,9 +371,8 @@ class AdminTaskAssignmentTestCase(TestCase):
         
         response = self.client.post(
             url,
-            data=json.dumps(assignment_data),
-            content_type='application/json',
-            **headers
+            data=assignment_data,
+            format='json'
         )
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -442,7 +398,7 @@ class AdminTaskAssignmentTestCase(TestCase):
         )
         
         url = reverse('service-request-assign', kwargs={'pk': self.service_request_completed.id})
-        headers = self.get_auth_headers(self.admin)
+        self.client.force_authenticate(user=self.admin)
         
         assignment_data = {
             'assigned_field_worker': another_worker.id
@@ -450,9 +406,8 @@ class AdminTaskAssignmentTestCase(TestCase):
         
         response = self.client.post(
             url,
-            data=json.dumps(assignment_data),
-            content_type='application/json',
-            **headers
+            data=assignment_data,
+            format='json'
         )
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -465,7 +420,7 @@ class AdminTaskAssignmentTestCase(TestCase):
     def test_assignment_with_invalid_data(self):
         """Test assignment with invalid data format."""
         url = reverse('service-request-assign', kwargs={'pk': self.service_request.id})
-        headers = self.get_auth_headers(self.admin)
+        self.client.force_authenticate(user=self.admin)
         
         # Test with string instead of integer
         assignment_data = {
@@ -474,9 +429,8 @@ class AdminTaskAssignmentTestCase(TestCase):
         
         response = self.client.post(
             url,
-            data=json.dumps(assignment_data),
-            content_type='application/json',
-            **headers
+            data=assignment_data,
+            format='json'
         )
         
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -485,15 +439,14 @@ class AdminTaskAssignmentTestCase(TestCase):
     def test_assignment_with_missing_field_worker_field(self):
         """Test assignment with missing assigned_field_worker field."""
         url = reverse('service-request-assign', kwargs={'pk': self.service_request.id})
-        headers = self.get_auth_headers(self.admin)
+        self.client.force_authenticate(user=self.admin)
         
         assignment_data = {}  # Missing assigned_field_worker field
         
         response = self.client.post(
             url,
-            data=json.dumps(assignment_data),
-            content_type='application/json',
-            **headers
+            data=assignment_data,
+            format='json'
         )
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -503,7 +456,7 @@ class AdminTaskAssignmentTestCase(TestCase):
     def test_assignment_to_nonexistent_service_request(self):
         """Test assignment to nonexistent service request."""
         url = reverse('service-request-assign', kwargs={'pk': 99999})
-        headers = self.get_auth_headers(self.admin)
+        self.client.force_authenticate(user=self.admin)
         
         assignment_data = {
             'assigned_field_worker': self.field_worker.id
@@ -511,9 +464,139 @@ class AdminTaskAssignmentTestCase(TestCase):
         
         response = self.client.post(
             url,
-            data=json.dumps(assignment_data),
-            content_type='application/json',
-            **headers
+            data=assignment_data,
+            format='json'
         )
         
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+    
+    def test_worker_approval_applies_to_next_assignment(self):
+        """Test that approving a worker makes them assignable straight away."""
+        url = reverse('service-request-assign', kwargs={'pk': self.service_request.id})
+        self.client.force_authenticate(user=self.admin)
+        
+        assignment_data = {
+            'assigned_field_worker': self.unapproved_worker.id
+        }
+        
+        response = self.client.post(
+            url,
+            data=assignment_data,
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        
+        self.unapproved_worker.is_approved = True
+        self.unapproved_worker.save()
+        
+        response = self.client.post(
+            url,
+            data=assignment_data,
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['assigned_field_worker'], self.unapproved_worker.id)
+    
+    def test_admin_can_bulk_assign_service_requests(self):
+        """Test that admin can assign several service requests in one call."""
+        another_worker = User.objects.create_user(
+            username='anotherworker',
+            email='another@test.com',
+            password='testpass123',
+            role='field_worker',
+            is_approved=True
+        )
+        url = reverse('service-request-bulk-assign')
+        self.client.force_authenticate(user=self.admin)
+        
+        assignment_data = [
+            {'service_request': self.service_request.id, 'assigned_field_worker': self.field_worker.id},
+            {'service_request': self.service_request_in_progress.id, 'assigned_field_worker': another_worker.id},
+        ]
+        
+        response = self.client.post(
+            url,
+            data=assignment_data,
+            format='json'
+        )
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 2)
+        
+        self.service_request.refresh_from_db()
+        self.assertEqual(self.service_request.assigned_field_worker, self.field_worker)
+        self.assertEqual(self.service_request.status, 'in_progress')
+        
+        self.service_request_in_progress.refresh_from_db()
+        self.assertEqual(self.service_request_in_progress.assigned_field_worker, another_worker)
+        self.assertEqual(self.service_request_in_progress.status, 'in_progress')
+        
+        self.assertTrue(Task.objects.filter(
+            service_request=self.service_request, assigned_to=self.field_worker, status='assigned'
+        ).exists())
+        self.assertTrue(Task.objects.filter(
+            service_request=self.service_request_in_progress, assigned_to=another_worker, status='assigned'
+        ).exists())
+    
+    def test_bulk_assign_drops_dashboard_counts_on_commit(self):
+        """Test that bulk assignment drops the cached dashboard counts only once it commits."""
+        url = reverse('service-request-bulk-assign')
+        self.client.force_authenticate(user=self.admin)
+        keys = (ADMIN_OVERVIEW_KEY, customer_summary_key(self.customer.id), worker_summary_key(self.field_worker.id))
+        cache.set_many({key: 'stale' for key in keys})
+        
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.post(
+                url,
+                data=[{'service_request': self.service_request.id, 'assigned_field_worker': self.field_worker.id}],
+                format='json'
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            # Still cached until the write commits
+            self.assertEqual(cache.get_many(keys), {key: 'stale' for key in keys})
+        
+        for callback in callbacks:
+            callback()
+        self.assertEqual(cache.get_many(keys), {})
+    
+    def test_bulk_assign_rejects_unapproved_worker(self):
+        """Test that one invalid worker rejects the whole bulk assignment."""
+        url = reverse('service-request-bulk-assign')
+        self.client.force_authenticate(user=self.admin)
+        
+        assignment_data = [
+            {'service_request': self.service_request.id, 'assigned_field_worker': self.field_worker.id},
+            {'service_request': self.service_request_in_progress.id, 'assigned_field_worker': self.unapproved_worker.id},
+        ]
+        
+        response = self.client.post(
+            url,
+            data=assignment_data,
+            format='json'
+        )
+        
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data['non_field_errors'],
+            [f'Users are not approved field workers: {[self.unapproved_worker.id]}.']
+        )
+        self.assertFalse(Task.objects.exists())
+        self.service_request.refresh_from_db()
+        self.assertIsNone(self.service_request.assigned_field_worker)
+    
+    def test_customer_cannot_bulk_assign_service_requests(self):
+        """Test that customers cannot bulk assign service requests."""
+        url = reverse('service-request-bulk-assign')
+        self.client.force_authenticate(user=self.customer)
+        
+        assignment_data = [
+            {'service_request': self.service_request.id, 'assigned_field_worker': self.field_worker.id},
+        ]
+        
+        response = self.client.post(
+            url,
+            data=assignment_data,
+            format='json'
+        )
+        
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -2,14 +2,17 @@
 Test cases for service request functionality.
 Tests customer creating service requests, viewing, updating, and rating.
 """
-import json
+
+from django.core.cache import cache
 from django.test import TestCase
+from django.utils import timezone
 from django.urls import reverse
 from rest_framework.test import APIClient
-from rest_framework import status
+from rest_framework import serializers, status
 from django.contrib.auth import get_user_model
 from rest_framework_simplejwt.tokens import RefreshToken
 from .models import ServiceRequest
+from .serializers import ServiceRequestListSerializer
 
 User = get_user_model()
 
@@ -17,12 +20,13 @@ User = get_user_model()
 class ServiceRequestTestCase(TestCase):
     """Test cases for service request creation and management."""
     
-    def setUp(self):
-        """Set up test data."""
-        self.client = APIClient()
-        
+    client_class = APIClient
+    
+    @classmethod
+    def setUpTestData(cls):
+        """Set up test data shared by every test in the class."""
         # Create test users
-        self.customer = User.objects.create_user(
+        cls.customer = User.objects.create_user(
             username='testcustomer',
             email='customer@test.com',
             password='testpass123',
@@ -30,7 +34,7 @@ class ServiceRequestTestCase(TestCase):
             is_approved=True
         )
         
-        self.field_worker = User.objects.create_user(
+        cls.field_worker = User.objects.create_user(
             username='testworker',
             email='worker@test.com',
             password='testpass123',
@@ -38,7 +42,7 @@ class ServiceRequestTestCase(TestCase):
             is_approved=True
         )
         
-        self.admin = User.objects.create_user(
+        cls.admin = User.objects.create_user(
             username='testadmin',
             email='admin@test.com',
             password='testpass123',
@@ -46,39 +50,59 @@ class ServiceRequestTestCase(TestCase):
             is_approved=True
         )
         
+        cls.other_customer = User.objects.create_user(
+            username='othercustomer',
+            email='other@test.com',
+            password='testpass123',
+            role='customer',
+            is_approved=True
+        )
+        
         # Service request data
-        self.service_request_data = {
+        cls.service_request_data = {
             'description': 'Fix broken water pipe in kitchen',
             'location': '123 Main St, City, State',
             'urgency': 'high'
         }
         
-        self.service_request_data_medium = {
+        cls.service_request_data_medium = {
             'description': 'Install new light fixture',
             'location': '456 Oak Ave, City, State',
             'urgency': 'medium'
         }
         
-        self.service_request_data_low = {
+        cls.service_request_data_low = {
             'description': 'Replace door handle',
             'location': '789 Pine St, City, State',
             'urgency': 'low'
         }
+        
+        # Resolve the list route once; detail routes depend on each test's row
+        cls.list_url = reverse('service-request-list')
+        
+        # Sign one access token per user rather than one per request
+        cls._auth_headers = {
+            user.pk: {'HTTP_AUTHORIZATION': f'Bearer {RefreshToken.for_user(user).access_token}'}
+            for user in (cls.customer, cls.field_worker, cls.admin)
+        }
+    
+    def setUp(self):
+        """Drop cached dashboard counts."""
+        cache.clear()
     
     def get_auth_headers(self, user):
         """Get authentication headers for a user."""
-        refresh = RefreshToken.for_user(user)
-        return {'HTTP_AUTHORIZATION': f'Bearer {str(refresh.access_token)}'}
+        return self._auth_headers[user.pk]
     
     def test_customer_create_service_request_success(self):
         """Test successful service request creation by customer."""
-        url = reverse('service-request-list')
+        url = self.list_url
         headers = self.get_auth_headers(self.customer)
         
         response = self.client.post(
             url,
-            data=json.dumps(self.service_request_data),
-            content_type='application/json',
+            data=self.service_request_data,
+            format='json',
             **headers
         )
         
@@ -98,39 +122,26 @@ class ServiceRequestTestCase(TestCase):
         self.assertEqual(service_request.urgency, 'high')
         self.assertEqual(service_request.status, 'open')
     
-    def test_customer_create_service_request_medium_urgency(self):
-        """Test service request creation with medium urgency."""
-        url = reverse('service-request-list')
+    def test_customer_create_service_request_other_urgencies(self):
+        """Test service request creation with medium and low urgency."""
+        url = self.list_url
         headers = self.get_auth_headers(self.customer)
         
-        response = self.client.post(
-            url,
-            data=json.dumps(self.service_request_data_medium),
-            content_type='application/json',
-            **headers
-        )
-        
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
-        self.assertEqual(response.data['urgency'], 'medium')
-    
-    def test_customer_create_service_request_low_urgency(self):
-        """Test service request creation with low urgency."""
-        url = reverse('service-request-list')
-        headers = self.get_auth_headers(self.customer)
-        
-        response = self.client.post(
-            url,
-            data=json.dumps(self.service_request_data_low),
-            content_type='application/json',
-            **headers
-        )
-        
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
-        self.assertEqual(response.data['urgency'], 'low')
+        for data in (self.service_request_data_medium, self.service_request_data_low):
+            with self.subTest(urgency=data['urgency']):
+                response = self.client.post(
+                    url,
+                    data=data,
+                    format='json',
+                    **headers
+                )
+                
+                self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+                self.assertEqual(response.data['urgency'], data['urgency'])
     
     def test_customer_create_service_request_missing_description(self):
         """Test service request creation with missing description."""
-        url = reverse('service-request-list')
+        url = self.list_url
         headers = self.get_auth_headers(self.customer)
         
         invalid_data = {
@@ -140,8 +151,8 @@ class ServiceRequestTestCase(TestCase):
         
         response = self.client.post(
             url,
-            data=json.dumps(invalid_data),
-            content_type='application/json',
+            data=invalid_data,
+            format='json',
             **headers
         )
         
@@ -150,7 +161,7 @@ class ServiceRequestTestCase(TestCase):
     
     def test_customer_create_service_request_missing_location(self):
         """Test service request creation with missing location."""
-        url = reverse('service-request-list')
+        url = self.list_url
         headers = self.get_auth_headers(self.customer)
         
         invalid_data = {
@@ -160,8 +171,8 @@ class ServiceRequestTestCase(TestCase):
         
         response = self.client.post(
             url,
-            data=json.dumps(invalid_data),
-            content_type='application/json',
+            data=invalid_data,
+            format='json',
             **headers
         )
         
@@ -170,7 +181,7 @@ class ServiceRequestTestCase(TestCase):
     
     def test_customer_create_service_request_invalid_urgency(self):
         """Test service request creation with invalid urgency."""
-        url = reverse('service-request-list')
+        url = self.list_url
         headers = self.get_auth_headers(self.customer)
         
         invalid_data = {
@@ -181,52 +192,38 @@ class ServiceRequestTestCase(TestCase):
         
         response = self.client.post(
             url,
-            data=json.dumps(invalid_data),
-            content_type='application/json',
+            data=invalid_data,
+            format='json',
             **headers
         )
         
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn('urgency', response.data)
     
-    def test_field_worker_cannot_create_service_request(self):
-        """Test that field workers cannot create service requests."""
-        url = reverse('service-request-list')
-        headers = self.get_auth_headers(self.field_worker)
-        
-        response = self.client.post(
-            url,
-            data=json.dumps(self.service_request_data),
-            content_type='application/json',
-            **headers
-        )
-        
-        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
-        self.assertIn('Only customers can create service requests', str(response.data))
-    
-    def test_admin_cannot_create_service_request(self):
-        """Test that admins cannot create service requests."""
-        url = reverse('service-request-list')
-        headers = self.get_auth_headers(self.admin)
-        
-        response = self.client.post(
-            url,
-            data=json.dumps(self.service_request_data),
-            content_type='application/json',
-            **headers
-        )
-        
-        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
-        self.assertIn('Only customers can create service requests', str(response.data))
+    def test_non_customers_cannot_create_service_request(self):
+        """Test that field workers and admins cannot create service requests."""
+        url = self.list_url
+        
+        for user in (self.field_worker, self.admin):
+            with self.subTest(role=user.role):
+                response = self.client.post(
+                    url,
+                    data=self.service_request_data,
+                    format='json',
+                    **self.get_auth_headers(user)
+                )
+                
+                self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+                self.assertEqual(response.data['detail'], 'Only customers can create service requests.')
     
     def test_unauthenticated_user_cannot_create_service_request(self):
         """Test that unauthenticated users cannot create service requests."""
-        url = reverse('service-request-list')
+        url = self.list_url
         
         response = self.client.post(
             url,
-            data=json.dumps(self.service_request_data),
-            content_type='application/json'
+            data=self.service_request_data,
+            format='json'
         )
         
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -241,7 +238,7 @@ class ServiceRequestTestCase(TestCase):
             urgency='high'
         )
         
-        url = reverse('service-request-list')
+        url = self.list_url
         headers = self.get_auth_headers(self.customer)
         
         response = self.client.get(url, **headers)
@@ -253,24 +250,15 @@ class ServiceRequestTestCase(TestCase):
     
     def test_customer_cannot_view_other_customers_service_requests(self):
         """Test that customers cannot view other customers' service requests."""
-        # Create another customer
-        other_customer = User.objects.create_user(
-            username='othercustomer',
-            email='other@test.com',
-            password='testpass123',
-            role='customer',
-            is_approved=True
-        )
-        
         # Create service request for other customer
         ServiceRequest.objects.create(
-            customer=other_customer,
+            customer=self.other_customer,
             description='Other customer service request',
             location='Other location',
             urgency='high'
         )
         
-        url = reverse('service-request-list')
+        url = self.list_url
         headers = self.get_auth_headers(self.customer)
         
         response = self.client.get(url, **headers)
@@ -281,29 +269,22 @@ class ServiceRequestTestCase(TestCase):
     def test_field_worker_can_view_all_service_requests(self):
         """Test that field workers can view all service requests."""
         # Create service requests for different customers
-        ServiceRequest.objects.create(
-            customer=self.customer,
-            description='Customer 1 service request',
-            location='Location 1',
-            urgency='high'
-        )
-        
-        other_customer = User.objects.create_user(
-            username='othercustomer',
-            email='other@test.com',
-            password='testpass123',
-            role='customer',
-            is_approved=True
-        )
-        
-        ServiceRequest.objects.create(
-            customer=other_customer,
-            description='Customer 2 service request',
-            location='Location 2',
-            urgency='medium'
-        )
-        
-        url = reverse('service-request-list')
+        ServiceRequest.objects.bulk_create([
+            ServiceRequest(
+                customer=self.customer,
+                description='Customer 1 service request',
+                location='Location 1',
+                urgency='high'
+            ),
+            ServiceRequest(
+                customer=self.other_customer,
+                description='Customer 2 service request',
+                location='Location 2',
+                urgency='medium'
+            ),
+        ])
+        
+        url = self.list_url
         headers = self.get_auth_headers(self.field_worker)
         
         response = self.client.get(url, **headers)
@@ -314,32 +295,27 @@ class ServiceRequestTestCase(TestCase):
     def test_admin_can_view_all_service_requests(self):
         """Test that admins can view all service requests."""
         # Create service requests for different customers
-        ServiceRequest.objects.create(
-            customer=self.customer,
-            description='Customer 1 service request',
-            location='Location 1',
-            urgency='high'
-        )
-        
-        other_customer = User.objects.create_user(
-            username='othercustomer',
-            email='other@test.com',
-            password='testpass123',
-            role='customer',
-            is_approved=True
-        )
-        
-        ServiceRequest.objects.create(
-            customer=other_customer,
-            description='Customer 2 service request',
-            location='Location 2',
-            urgency='medium'
-        )
-        
-        url = reverse('service-request-list')
+        ServiceRequest.objects.bulk_create([
+            ServiceRequest(
+                customer=self.customer,
+                description='Customer 1 service request',
+                location='Location 1',
+                urgency='high'
+            ),
+            ServiceRequest(
+                customer=self.other_customer,
+                description='Customer 2 service request',
+                location='Location 2',
+                urgency='medium'
+            ),
+        ])
+        
+        url = self.list_url
         headers = self.get_auth_headers(self.admin)
         
-        response = self.client.get(url, **headers)
+        # Token user lookup, page count and page rows; nothing per row
+        with self.assertNumQueries(3):
+            response = self.client.get(url, **headers)
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data['results']), 2)
@@ -363,18 +339,37 @@ class ServiceRequestTestCase(TestCase):
         self.assertEqual(response.data['description'], 'Test service request')
         self.assertEqual(response.data['customer'], self.customer.id)
     
-    def test_customer_cannot_view_other_customers_service_request_detail(self):
-        """Test that customers cannot view details of other customers' service requests."""
-        other_customer = User.objects.create_user(
-            username='othercustomer',
-            email='other@test.com',
-            password='testpass123',
-            role='customer',
-            is_approved=True
+    def test_service_request_detail_revalidates_with_etag(self):
+        """Test that an unchanged service request answers If-None-Match with 304."""
+        service_request = ServiceRequest.objects.create(
+            customer=self.customer,
+            description='Test service request',
+            location='Test location',
+            urgency='high'
         )
         
+        url = reverse('service-request-detail', kwargs={'pk': service_request.id})
+        headers = self.get_auth_headers(self.customer)
+        
+        response = self.client.get(url, **headers)
+        etag = response['ETag']
+        
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag, **headers)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        
+        # Any save bumps updated_at and with it the ETag
+        service_request.description = 'Updated description'
+        service_request.save()
+        
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag, **headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['description'], 'Updated description')
+        self.assertNotEqual(response['ETag'], etag)
+    
+    def test_customer_cannot_view_other_customers_service_request_detail(self):
+        """Test that customers cannot view details of other customers' service requests."""
         service_request = ServiceRequest.objects.create(
-            customer=other_customer,
+            customer=self.other_customer,
             description='Other customer service request',
             location='Other location',
             urgency='high'
@@ -407,8 +402,8 @@ class ServiceRequestTestCase(TestCase):
         
         response = self.client.patch(
             url,
-            data=json.dumps(update_data),
-            content_type='application/json',
+            data=update_data,
+            format='json',
             **headers
         )
         
@@ -425,16 +420,8 @@ class ServiceRequestTestCase(TestCase):
     
     def test_customer_cannot_update_other_customers_service_request(self):
         """Test that customers cannot update other customers' service requests."""
-        other_customer = User.objects.create_user(
-            username='othercustomer',
-            email='other@test.com',
-            password='testpass123',
-            role='customer',
-            is_approved=True
-        )
-        
         service_request = ServiceRequest.objects.create(
-            customer=other_customer,
+            customer=self.other_customer,
             description='Original description',
             location='Original location',
             urgency='high'
@@ -451,8 +438,8 @@ class ServiceRequestTestCase(TestCase):
         
         response = self.client.patch(
             url,
-            data=json.dumps(update_data),
-            content_type='application/json',
+            data=update_data,
+            format='json',
             **headers
         )
         
@@ -473,12 +460,15 @@ class ServiceRequestTestCase(TestCase):
         url = reverse('service-request-rate', kwargs={'pk': service_request.id})
         headers = self.get_auth_headers(self.customer)
         
-        response = self.client.post(
-            url,
-            data=json.dumps(rating_data),
-            content_type='application/json',
-            **headers
-        )
+        # Token user lookup, the service request and the UPDATE; rendering
+        # the detail response must not lazy-load any relation
+        with self.assertNumQueries(3):
+            response = self.client.post(
+                url,
+                data=rating_data,
+                format='json',
+                **headers
+            )
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['rating'], 5)
@@ -504,26 +494,18 @@ class ServiceRequestTestCase(TestCase):
         
         response = self.client.post(
             url,
-            data=json.dumps(rating_data),
-            content_type='application/json',
+            data=rating_data,
+            format='json',
             **headers
         )
         
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertIn('Rating allowed only when status is completed', str(response.data))
+        self.assertEqual(response.data['detail'], 'Rating allowed only when status is completed.')
     
     def test_customer_cannot_rate_other_customers_service_request(self):
         """Test that customers cannot rate other customers' service requests."""
-        other_customer = User.objects.create_user(
-            username='othercustomer',
-            email='other@test.com',
-            password='testpass123',
-            role='customer',
-            is_approved=True
-        )
-        
         service_request = ServiceRequest.objects.create(
-            customer=other_customer,
+            customer=self.other_customer,
             description='Other customer service request',
             location='Other location',
             urgency='high',
@@ -537,8 +519,8 @@ class ServiceRequestTestCase(TestCase):
         
         response = self.client.post(
             url,
-            data=json.dumps(rating_data),
-            content_type='application/json',
+            data=rating_data,
+            format='json',
             **headers
         )
         
@@ -554,34 +536,20 @@ class ServiceRequestTestCase(TestCase):
             status='completed'
         )
         
-        # Test rating too high
-        rating_data = {'rating': 6}
-        
         url = reverse('service-request-rate', kwargs={'pk': service_request.id})
         headers = self.get_auth_headers(self.customer)
         
-        response = self.client.post(
-            url,
-            data=json.dumps(rating_data),
-            content_type='application/json',
-            **headers
-        )
-        
-        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertIn('Rating must be between 1 and 5', str(response.data))
-        
-        # Test rating too low
-        rating_data = {'rating': 0}
-        
-        response = self.client.post(
-            url,
-            data=json.dumps(rating_data),
-            content_type='application/json',
-            **headers
-        )
-        
-        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertIn('Rating must be between 1 and 5', str(response.data))
+        for rating in (6, 0, -1, 11):
+            with self.subTest(rating=rating):
+                response = self.client.post(
+                    url,
+                    data={'rating': rating},
+                    format='json',
+                    **headers
+                )
+                
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+                self.assertEqual(response.data['rating'], ['Rating must be between 1 and 5.'])
     
     def test_customer_can_delete_own_service_request(self):
         """Test that customers can delete their own service requests."""
@@ -604,16 +572,8 @@ class ServiceRequestTestCase(TestCase):
     
     def test_customer_cannot_delete_other_customers_service_request(self):
         """Test that customers cannot delete other customers' service requests."""
-        other_customer = User.objects.create_user(
-            username='othercustomer',
-            email='other@test.com',
-            password='testpass123',
-            role='customer',
-            is_approved=True
-        )
-        
         service_request = ServiceRequest.objects.create(
-            customer=other_customer,
+            customer=self.other_customer,
             description='Other customer service request',
             location='Other location',
             urgency='high'
@@ -628,3 +588,15 @@ class ServiceRequestTestCase(TestCase):
         
         # Verify service request still exists
         self.assertTrue(ServiceRequest.objects.filter(id=service_request.id).exists())
+    
+    def test_list_serializer_matches_default_representation(self):
+        """Test that the flattened list rows, with their worker id, match DRF's field-by-field output."""
+        service_request = ServiceRequest(
+            id=3, customer_id=4, assigned_field_worker_id=5, description='Test service request',
+            location='Test location', urgency='high', rating=4, created_at=timezone.now()
+        )
+        
+        serializer = ServiceRequestListSerializer()
+        expected = serializers.ModelSerializer.to_representation(serializer, service_request)
+        
+        self.assertEqual(serializer.to_representation(service_request), dict(expected))
@@ -1,31 +1,62 @@
+from collections import defaultdict
+from functools import partial
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
+from rest_framework.generics import get_object_or_404
 from rest_framework.response import Response
+from dashboard.cache import invalidate_admin_overview, invalidate_customer_summary, invalidate_worker_summary
+from fieldops.serializers import optimize_queryset
+from tasks.models import Task
+from users.permissions import user_flags
 from .models import ServiceRequest
-from .permissions import IsOwnerOrAdmin
+from .permissions import IsCustomerToCreate, IsOwnerOrAdmin
 from .serializers import (
     ServiceRequestListSerializer,
     ServiceRequestDetailSerializer,
     ServiceRequestCreateUpdateSerializer,
     ServiceRequestRatingSerializer,
     ServiceRequestAssignmentSerializer,
+    ServiceRequestBulkAssignmentSerializer,
 )
 from drf_yasg.utils import swagger_auto_schema
 
+User = get_user_model()
+
 
 class ServiceRequestViewSet(viewsets.ModelViewSet):
-    queryset = ServiceRequest.objects.select_related("customer").all()
-    permission_classes = [permissions.IsAuthenticated & IsOwnerOrAdmin]
+    # Reads go through get_queryset, which scopes rows by role and takes its
+    # joins from the action's serializer; this only names the model
+    queryset = ServiceRequest.objects.none()
+    permission_classes = [permissions.IsAuthenticated, IsOwnerOrAdmin, IsCustomerToCreate]
 
     @swagger_auto_schema(operation_summary="List service requests",
                          operation_description="Get a list of service requests. Customers see only their own requests, field workers and admins see all requests.")
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
+    @swagger_auto_schema(operation_summary="Create a service request",
+                         operation_description="Customer creates a new service request. Only customers can create service requests.")
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
+
     @swagger_auto_schema(operation_summary="Retrieve service request",
                          operation_description="Get details of a specific service request. Customers can only view their own requests.")
     def retrieve(self, request, *args, **kwargs):
-        return super().retrieve(request, *args, **kwargs)
+        service_request = self.get_object()
+        # Every write path bumps updated_at, so it versions the representation;
+        # pollers holding the current version get a 304 without a body render
+        etag = quote_etag(f'{service_request.pk}-{service_request.updated_at.timestamp()}')
+        response = get_conditional_response(request, etag=etag)
+        if response is not None:
+            return response
+        serializer = self.get_serializer(service_request)
+        return Response(serializer.data, headers={'ETag': etag})
 
     @swagger_auto_schema(operation_summary="Update service request",
                          operation_description="Update an existing service request. Only the owner or admin can update.")
@@ -43,37 +74,32 @@ class ServiceRequestViewSet(viewsets.ModelViewSet):
         return super().destroy(request, *args, **kwargs)
 
     def get_queryset(self):
-        user = self.request.user
-        if getattr(user, "is_admin", False):
-            return ServiceRequest.objects.all()
-        if getattr(user, "is_field_worker", False):
+        # Role flags are shared with the permission classes for the rest of the request
+        flags = user_flags(self.request)
+        queryset = optimize_queryset(
+            ServiceRequest.objects.all(), self.get_serializer_class(), trim_columns=self.action == "list"
+        )
+        if flags.is_admin:
+            return queryset
+        if flags.is_field_worker:
             # Keep simple: workers can read all requests
-            return ServiceRequest.objects.all()
+            return queryset
         # Customers see only their own
-        return ServiceRequest.objects.filter(customer=user)
+        return queryset.filter(customer_id=self.request.user.pk)
 
-    def get_serializer_class(self):
-        if self.action in ["list"]:
-            return ServiceRequestListSerializer
-        if self.action in ["retrieve"]:
-            return ServiceRequestDetailSerializer
-        if self.action in ["create", "update", "partial_update"]:
-            return ServiceRequestCreateUpdateSerializer
-        if self.action == "rate":
-            return ServiceRequestRatingSerializer
-        if self.action == "assign":
-            return ServiceRequestAssignmentSerializer
-        return ServiceRequestDetailSerializer
+    serializer_classes = {
+        "list": ServiceRequestListSerializer,
+        "retrieve": ServiceRequestDetailSerializer,
+        "create": ServiceRequestCreateUpdateSerializer,
+        "update": ServiceRequestCreateUpdateSerializer,
+        "partial_update": ServiceRequestCreateUpdateSerializer,
+        "rate": ServiceRequestRatingSerializer,
+        "assign": ServiceRequestAssignmentSerializer,
+        "bulk_assign": ServiceRequestBulkAssignmentSerializer,
+    }
 
-    @swagger_auto_schema(operation_summary="Create a service request",
-                         operation_description="Customer creates a new service request. Only customers can create service requests.")
-    def perform_create(self, serializer):
-        # Only customers can create service requests
-        user = self.request.user
-        if not getattr(user, 'is_customer', False):
-            from rest_framework.exceptions import PermissionDenied
-            raise PermissionDenied('Only customers can create service requests.')
-        serializer.save()
+    def get_serializer_class(self):
+        return self.serializer_classes.get(self.action, ServiceRequestDetailSerializer)
 
     @swagger_auto_schema(operation_summary="Rate a completed service request",
                          operation_description="Customer rates their own completed service request (1-5).")
@@ -81,59 +107,107 @@ class ServiceRequestViewSet(viewsets.ModelViewSet):
     def rate(self, request, pk=None):
         # Customer can rate only their own request and only when completed
         service_request = self.get_object()
-        user = request.user
-        if not getattr(user, 'is_customer', False) or service_request.customer_id != user.id:
+        if not user_flags(request).is_customer or service_request.customer_id != request.user.id:
             return Response({'detail': 'Not allowed'}, status=status.HTTP_403_FORBIDDEN)
         if service_request.status != 'completed':
             return Response({'detail': 'Rating allowed only when status is completed.'}, status=status.HTTP_400_BAD_REQUEST)
-        serializer = ServiceRequestRatingSerializer(service_request, data=request.data, partial=True)
+        serializer = ServiceRequestRatingSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        serializer.save()
+        if 'rating' in serializer.validated_data:
+            # Single-column UPDATE; rating doesn't feed any signal-driven cache
+            service_request.rating = serializer.validated_data['rating']
+            service_request.updated_at = timezone.now()
+            ServiceRequest.objects.filter(pk=service_request.pk).update(
+                rating=service_request.rating, updated_at=service_request.updated_at
+            )
         return Response(ServiceRequestDetailSerializer(service_request).data)
     @swagger_auto_schema(operation_summary="Assign service request to field worker",
                          operation_description="Admin assigns a service request to a field worker. This creates a task for the field worker and updates the service request status to in_progress.")
     @action(detail=True, methods=['post'], url_path='assign')
     def assign(self, request, pk=None):
         # Only admins can assign service requests to field workers
-        user = request.user
-        if not getattr(user, 'is_admin', False):
+        if not user_flags(request).is_admin:
             return Response({'detail': 'Only admins can assign service requests.'}, status=status.HTTP_403_FORBIDDEN)
         
-        service_request = self.get_object()
-        serializer = ServiceRequestAssignmentSerializer(service_request, data=request.data, partial=True)
-        serializer.is_valid(raise_exception=True)
-        
-        # Handle the assignment manually since we're using IntegerField
-        assigned_field_worker_id = serializer.validated_data.get('assigned_field_worker')
-        if assigned_field_worker_id:
-            from django.contrib.auth import get_user_model
-            from tasks.models import Task
-            User = get_user_model()
-            try:
-                field_worker = User.objects.get(id=assigned_field_worker_id)
+        with transaction.atomic():
+            # Lock the row so concurrent assignments of one request apply in turn
+            service_request = get_object_or_404(self.filter_queryset(self.get_queryset()).select_for_update(), pk=pk)
+            self.check_object_permissions(request, service_request)
+            serializer = ServiceRequestAssignmentSerializer(service_request, data=request.data, partial=True)
+            serializer.is_valid(raise_exception=True)
+            
+            # Handle the assignment manually since we're using IntegerField
+            assigned_field_worker_id = serializer.validated_data.get('assigned_field_worker')
+            if assigned_field_worker_id:
+                # Only the key is needed to link the worker
+                field_worker = User.objects.only('id').filter(pk=assigned_field_worker_id).first()
+                if field_worker is None:
+                    return Response({'detail': 'Field worker not found.'}, status=status.HTTP_400_BAD_REQUEST)
                 service_request.assigned_field_worker = field_worker
                 
-                # Create a task for the field worker if one doesn't exist
-                task, created = Task.objects.get_or_create(
-                    service_request=service_request,
-                    assigned_to=field_worker,
-                    defaults={'status': 'assigned'}
-                )
-                
-            except User.DoesNotExist:
-                return Response({'detail': 'Field worker not found.'}, status=status.HTTP_400_BAD_REQUEST)
-        else:
-            service_request.assigned_field_worker = None
-        
-        service_request.save()
-        
-        # Update status to in_progress when assigned
-        if service_request.status == 'open' and assigned_field_worker_id:
-            service_request.status = 'in_progress'
-            service_request.save()
+                # Create a task for the field worker if one doesn't exist; the
+                # row lock above keeps the check and the INSERT together
+                if not Task.objects.filter(service_request=service_request, assigned_to=field_worker).exists():
+                    Task.objects.create(service_request=service_request, assigned_to=field_worker, status='assigned')
+            else:
+                service_request.assigned_field_worker = None
+            
+            # Update status to in_progress when assigned
+            if service_request.status == 'open' and assigned_field_worker_id:
+                service_request.status = 'in_progress'
+            
+            # One UPDATE covering the assignment and any status change
+            service_request.save(update_fields=['assigned_field_worker', 'status', 'updated_at'])
         
         return Response(ServiceRequestDetailSerializer(service_request).data)
 
-from django.shortcuts import render
-
-# Create your views here.
+    @swagger_auto_schema(operation_summary="Assign several service requests at once",
+                         operation_description="Admin assigns a list of service requests to field workers in one call. Workers and requests are validated together, matching tasks are created and open requests move to in_progress.",
+                         request_body=ServiceRequestBulkAssignmentSerializer(many=True))
+    @action(detail=False, methods=['post'], url_path='bulk-assign')
+    def bulk_assign(self, request):
+        # Only admins can assign service requests to field workers
+        if not user_flags(request).is_admin:
+            return Response({'detail': 'Only admins can assign service requests.'}, status=status.HTTP_403_FORBIDDEN)
+        
+        serializer = ServiceRequestBulkAssignmentSerializer(data=request.data, many=True, allow_empty=False)
+        serializer.is_valid(raise_exception=True)
+        assignments = {row['service_request']: row['assigned_field_worker'] for row in serializer.validated_data}
+        
+        requests_by_worker = defaultdict(list)
+        for service_request_id, worker_id in assignments.items():
+            requests_by_worker[worker_id].append(service_request_id)
+        
+        now = timezone.now()
+        with transaction.atomic():
+            # One UPDATE per target worker and one for the open -> in_progress move
+            for worker_id, service_request_ids in requests_by_worker.items():
+                ServiceRequest.objects.filter(pk__in=service_request_ids).update(
+                    assigned_field_worker_id=worker_id, updated_at=now
+                )
+            ServiceRequest.objects.filter(pk__in=assignments, status='open').update(
+                status='in_progress', updated_at=now
+            )
+            
+            # Create the tasks that don't exist yet in a single INSERT
+            existing = set(
+                Task.objects.filter(service_request_id__in=assignments, assigned_to_id__in=requests_by_worker)
+                .values_list('service_request_id', 'assigned_to_id')
+            )
+            Task.objects.bulk_create([
+                Task(service_request_id=service_request_id, assigned_to_id=worker_id, status='assigned')
+                for service_request_id, worker_id in assignments.items()
+                if (service_request_id, worker_id) not in existing
+            ])
+            
+            service_requests = list(ServiceRequest.objects.filter(pk__in=assignments))
+            
+            # Bulk writes skip model signals, so drop the cached dashboard
+            # counts here, once the write commits
+            transaction.on_commit(invalidate_admin_overview)
+            for customer_id in {service_request.customer_id for service_request in service_requests}:
+                transaction.on_commit(partial(invalidate_customer_summary, customer_id))
+            for worker_id in requests_by_worker:
+                transaction.on_commit(partial(invalidate_worker_summary, worker_id))
+        
+        return Response(ServiceRequestDetailSerializer(service_requests, many=True).data)
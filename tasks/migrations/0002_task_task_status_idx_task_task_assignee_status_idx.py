@@ -0,0 +1,24 @@
+# Generated by Django 5.2.6 on 2026-10-15 03:06
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('service_requests', '0003_servicerequest_sr_status_idx_and_more'),
+        ('tasks', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['status'], name='task_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['assigned_to', 'status'], name='task_assignee_status_idx'),
+        ),
+    ]
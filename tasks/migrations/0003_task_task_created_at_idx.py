@@ -0,0 +1,20 @@
+# Generated by Django 5.2.6 on 2026-10-15 03:18
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('service_requests', '0004_servicerequest_sr_created_at_idx'),
+        ('tasks', '0002_task_task_status_idx_task_task_assignee_status_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['-created_at'], name='task_created_at_idx'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.6 on 2026-10-15 03:21
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('service_requests', '0005_remove_servicerequest_sr_status_idx_and_more'),
+        ('tasks', '0003_task_task_created_at_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='task',
+            constraint=models.CheckConstraint(condition=models.Q(('status__in', ['assigned', 'in_progress', 'completed'])), name='task_status_valid'),
+        ),
+    ]
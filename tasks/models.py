@@ -39,6 +39,17 @@ class Task(models.Model):
     class Meta:
         db_table = "tasks"
         ordering = ("-created_at",)
+        indexes = [
+            models.Index(fields=["status"], name="task_status_idx"),
+            models.Index(fields=["assigned_to", "status"], name="task_assignee_status_idx"),
+            models.Index(fields=["-created_at"], name="task_created_at_idx"),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(status__in=["assigned", "in_progress", "completed"]),
+                name="task_status_valid",
+            ),
+        ]
 
     def __str__(self) -> str:
         return f"Task #{self.id} for SR {self.service_request_id} ({self.status})"
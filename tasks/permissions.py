@@ -1,17 +1,16 @@
 from rest_framework.permissions import BasePermission, SAFE_METHODS
 
+from users.permissions import user_flags
+
 
 class IsAdminOrAssigneeOrReadOnly(BasePermission):
     """Admins full access. Assignee can update their task. Others read-only."""
 
     def has_object_permission(self, request, view, obj):
-        user = request.user
-        if not user or not user.is_authenticated:
-            return False
-        if getattr(user, 'is_admin', False):
-            return True
+        # Reads, the bulk of the traffic, only need an authenticated user
         if request.method in SAFE_METHODS:
-            return True
-        return getattr(obj, 'assigned_to_id', None) == getattr(user, 'id', None)
-
-
+            return bool(request.user and request.user.is_authenticated)
+        flags = user_flags(request)
+        if not flags.is_authenticated:
+            return False
+        return flags.is_admin or obj.assigned_to_id == request.user.id
@@ -1,8 +1,9 @@
 from rest_framework import serializers
+from fieldops.serializers import CachedFieldsMixin, FlatRowRepresentationMixin, UpdateFieldsMixin
 from .models import Task
 
 
-class TaskListSerializer(serializers.ModelSerializer):
+class TaskListSerializer(CachedFieldsMixin, FlatRowRepresentationMixin, serializers.ModelSerializer):
     service_request_description = serializers.CharField(source='service_request.description', read_only=True)
     service_request_location = serializers.CharField(source='service_request.location', read_only=True)
     service_request_urgency = serializers.CharField(source='service_request.urgency', read_only=True)
@@ -16,7 +17,7 @@ class TaskListSerializer(serializers.ModelSerializer):
         read_only_fields = ('id', 'created_at')
 
 
-class TaskDetailSerializer(serializers.ModelSerializer):
+class TaskDetailSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Task
         fields = (
@@ -26,12 +27,28 @@ class TaskDetailSerializer(serializers.ModelSerializer):
         read_only_fields = ('id', 'created_at', 'updated_at')
 
 
-class TaskCreateUpdateSerializer(serializers.ModelSerializer):
+class TaskCreateUpdateSerializer(CachedFieldsMixin, UpdateFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Task
         fields = ('service_request', 'assigned_to', 'notes')
 
 
+# Allowed next statuses for each current status; staying put is always allowed
+_VALID_TRANSITIONS = {
+    'assigned': frozenset({'in_progress'}),
+    'in_progress': frozenset({'completed'}),
+    'completed': frozenset(),  # No transitions from completed
+}
+
+
+def _transition_error(current_status, value):
+    """Why a task can't move from current_status to value, or None if it can."""
+    allowed = _VALID_TRANSITIONS.get(current_status, frozenset())
+    if value == current_status or value in allowed:
+        return None
+    return f'Cannot transition from {current_status} to {value}. Valid transitions: {sorted(allowed)}'
+
+
 class TaskStatusSerializer(serializers.ModelSerializer):
     class Meta:
         model = Task
@@ -40,26 +57,45 @@ class TaskStatusSerializer(serializers.ModelSerializer):
     def validate_status(self, value):
         # Validate status transitions
         if hasattr(self, 'instance') and self.instance:
-            current_status = self.instance.status
-            valid_transitions = {
-                'assigned': ['in_progress'],
-                'in_progress': ['completed'],
-                'completed': []  # No transitions from completed
-            }
-            
-            if value in valid_transitions.get(current_status, []):
-                return value
-            elif value == current_status:
-                return value  # Allow same status
-            else:
-                raise serializers.ValidationError(
-                    f'Cannot transition from {current_status} to {value}. '
-                    f'Valid transitions: {valid_transitions.get(current_status, [])}'
-                )
+            error = _transition_error(self.instance.status, value)
+            if error:
+                raise serializers.ValidationError(error)
         return value
 
 
-class TaskProofUploadSerializer(serializers.ModelSerializer):
+class BulkStatusListSerializer(serializers.ListSerializer):
+    """Validate every row of a bulk status change against the tasks' current statuses in one query."""
+
+    def validate(self, attrs):
+        task_ids = [row['task'] for row in attrs]
+        if len(set(task_ids)) != len(task_ids):
+            raise serializers.ValidationError('Each task may appear only once.')
+        
+        current = dict(Task.objects.filter(pk__in=task_ids).values_list('id', 'status'))
+        missing = sorted(set(task_ids) - current.keys())
+        if missing:
+            raise serializers.ValidationError(f'Tasks not found: {missing}.')
+        
+        errors = []
+        for row in attrs:
+            row['current_status'] = current[row['task']]
+            error = _transition_error(row['current_status'], row['status'])
+            if error:
+                errors.append(f"Task {row['task']}: {error}")
+        if errors:
+            raise serializers.ValidationError(errors)
+        return attrs
+
+
+class TaskBulkStatusSerializer(serializers.Serializer):
+    task = serializers.IntegerField(help_text="ID of the task to update")
+    status = serializers.ChoiceField(choices=Task.Status.choices, help_text="Status to move the task to")
+    
+    class Meta:
+        list_serializer_class = BulkStatusListSerializer
+
+
+class TaskProofUploadSerializer(UpdateFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Task
         fields = ('proof_upload', 'notes')
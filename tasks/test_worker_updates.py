@@ -2,117 +2,109 @@
 Test cases for worker task update functionality.
 Tests worker updating tasks, uploading proof, and marking tasks complete.
 """
-import json
-import tempfile
-import os
-from django.test import TestCase
+from unittest import mock
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework.test import APIClient
-from rest_framework import status
+from rest_framework import serializers, status
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.core.files.uploadedfile import SimpleUploadedFile
+from dashboard.cache import ADMIN_OVERVIEW_KEY, customer_summary_key, worker_summary_key
 from .models import Task
+from .serializers import TaskListSerializer
+from .views import TaskViewSet
 from service_requests.models import ServiceRequest
 
 User = get_user_model()
 
+PROOF_CONTENT = b'file_content'
 
+
+# Keep uploaded proofs in memory so the tests never write under MEDIA_ROOT
+@override_settings(STORAGES={
+    'default': {'BACKEND': 'django.core.files.storage.InMemoryStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+})
 class WorkerTaskUpdateTestCase(TestCase):
     """Test cases for worker task update functionality."""
     
-    def setUp(self):
-        """Set up test data."""
-        self.client = APIClient()
-        
-        # Create test users
-        self.customer = User.objects.create_user(
-            username='testcustomer',
-            email='customer@test.com',
-            password='testpass123',
-            role='customer',
-            is_approved=True
-        )
-        
-        self.field_worker = User.objects.create_user(
-            username='testworker',
-            email='worker@test.com',
-            password='testpass123',
-            role='field_worker',
-            is_approved=True
-        )
-        
-        self.other_worker = User.objects.create_user(
-            username='otherworker',
-            email='other@test.com',
-            password='testpass123',
-            role='field_worker',
-            is_approved=True
-        )
-        
-        self.admin = User.objects.create_user(
-            username='testadmin',
-            email='admin@test.com',
-            password='testpass123',
-            role='admin',
-            is_approved=True
-        )
+    client_class = APIClient
+    
+    @classmethod
+    def setUpTestData(cls):
+        """Set up test data shared by every test in the class."""
+        # Create test users in one INSERT. Requests carry tokens minted
+        # for these users rather than logging in, so they can all share
+        # one precomputed password hash
+        password = make_password('testpass123')
+        cls.customer, cls.field_worker, cls.other_worker, cls.admin = User.objects.bulk_create([
+            User(username='testcustomer', email='customer@test.com', password=password,
+                 role='customer', is_approved=True),
+            User(username='testworker', email='worker@test.com', password=password,
+                 role='field_worker', is_approved=True),
+            User(username='otherworker', email='other@test.com', password=password,
+                 role='field_worker', is_approved=True),
+            User(username='testadmin', email='admin@test.com', password=password,
+                 role='admin', is_approved=True),
+        ])
         
         # Create service requests
-        self.service_request = ServiceRequest.objects.create(
-            customer=self.customer,
-            description='Fix broken water pipe',
-            location='123 Main St, City, State',
-            urgency='high',
-            status='in_progress',
-            assigned_field_worker=self.field_worker
-        )
-        
-        self.service_request_other = ServiceRequest.objects.create(
-            customer=self.customer,
-            description='Install new light fixture',
-            location='456 Oak Ave, City, State',
-            urgency='medium',
-            status='in_progress',
-            assigned_field_worker=self.other_worker
-        )
+        cls.service_request, cls.service_request_other = ServiceRequest.objects.bulk_create([
+            ServiceRequest(customer=cls.customer, description='Fix broken water pipe',
+                           location='123 Main St, City, State', urgency='high', status='in_progress',
+                           assigned_field_worker=cls.field_worker),
+            ServiceRequest(customer=cls.customer, description='Install new light fixture',
+                           location='456 Oak Ave, City, State', urgency='medium', status='in_progress',
+                           assigned_field_worker=cls.other_worker),
+        ])
         
         # Create tasks
-        self.assigned_task = Task.objects.create(
-            service_request=self.service_request,
-            assigned_to=self.field_worker,
-            status='assigned'
-        )
-        
-        self.in_progress_task = Task.objects.create(
-            service_request=self.service_request,
-            assigned_to=self.field_worker,
-            status='in_progress'
-        )
-        
-        self.completed_task = Task.objects.create(
-            service_request=self.service_request,
-            assigned_to=self.field_worker,
-            status='completed'
-        )
-        
-        self.other_worker_task = Task.objects.create(
-            service_request=self.service_request_other,
-            assigned_to=self.other_worker,
-            status='assigned'
-        )
+        (
+            cls.assigned_task,
+            cls.in_progress_task,
+            cls.completed_task,
+            cls.other_worker_task,
+        ) = Task.objects.bulk_create([
+            Task(service_request=cls.service_request, assigned_to=cls.field_worker, status='assigned'),
+            Task(service_request=cls.service_request, assigned_to=cls.field_worker, status='in_progress'),
+            Task(service_request=cls.service_request, assigned_to=cls.field_worker, status='completed'),
+            Task(service_request=cls.service_request_other, assigned_to=cls.other_worker, status='assigned'),
+        ])
+        
+        # One signed token per user for the whole class
+        cls._auth_headers = {
+            user.pk: {'HTTP_AUTHORIZATION': f'Bearer {RefreshToken.for_user(user).access_token}'}
+            for user in (cls.customer, cls.field_worker, cls.other_worker, cls.admin)
+        }
+    
+    def setUp(self):
+        """Drop cached dashboard counts."""
+        # Fixtures go in with bulk_create, which skips the signals that
+        # would otherwise invalidate them
+        cache.clear()
+    
+    def _make_proof_file(self, name='test_proof.jpg', content=PROOF_CONTENT, content_type='image/jpeg'):
+        """Build a fresh upload; each request consumes the file it is sent."""
+        return SimpleUploadedFile(name, content, content_type=content_type)
     
     def get_auth_headers(self, user):
         """Get authentication headers for a user."""
-        refresh = RefreshToken.for_user(user)
-        return {'HTTP_AUTHORIZATION': f'Bearer {str(refresh.access_token)}'}
+        return self._auth_headers[user.pk]
     
     def test_worker_can_view_own_tasks(self):
         """Test that field workers can view their own assigned tasks."""
         url = reverse('task-list')
         headers = self.get_auth_headers(self.field_worker)
         
-        response = self.client.get(url, **headers)
+        # Token user lookup, page count and page rows joined to their service
+        # requests; nothing per row
+        with self.assertNumQueries(3):
+            response = self.client.get(url, **headers)
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data['results']), 3)  # 3 tasks assigned to field_worker
@@ -124,6 +116,29 @@ class WorkerTaskUpdateTestCase(TestCase):
         self.assertIn(self.completed_task.id, task_ids)
         self.assertNotIn(self.other_worker_task.id, task_ids)
     
+    def test_list_serializer_matches_default_representation(self):
+        """Test that the flattened list rows, read through the service request, match DRF's field-by-field output."""
+        task = Task.objects.select_related('service_request').get(pk=self.in_progress_task.pk)
+        
+        serializer = TaskListSerializer()
+        expected = serializers.ModelSerializer.to_representation(serializer, task)
+        
+        self.assertEqual(serializer.to_representation(task), dict(expected))
+    
+    def test_admin_task_list_query_count_is_independent_of_tasks(self):
+        """Test that the task list reads a page of ten more tasks without per-row queries."""
+        Task.objects.bulk_create([
+            Task(service_request=self.service_request_other, assigned_to=self.other_worker)
+            for _ in range(10)
+        ])
+        headers = self.get_auth_headers(self.admin)
+        
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('task-list'), **headers)
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 14)
+    
     def test_worker_cannot_view_other_workers_tasks(self):
         """Test that field workers cannot view other workers' tasks."""
         url = reverse('task-list')
@@ -146,7 +161,9 @@ class WorkerTaskUpdateTestCase(TestCase):
         url = reverse('task-detail', kwargs={'pk': self.assigned_task.id})
         headers = self.get_auth_headers(self.field_worker)
         
-        response = self.client.get(url, **headers)
+        # Token user lookup and the task row
+        with self.assertNumQueries(2):
+            response = self.client.get(url, **headers)
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['id'], self.assigned_task.id)
@@ -169,7 +186,10 @@ class WorkerTaskUpdateTestCase(TestCase):
         
         status_data = {'status': 'in_progress'}
         
-        response = self.client.post(url, data=status_data, **headers)
+        # Token user lookup, task read and the compare-and-swap UPDATE, plus
+        # the savepoint pair the test's transaction puts around the write
+        with self.assertNumQueries(5):
+            response = self.client.post(url, data=status_data, **headers)
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['status'], 'in_progress')
@@ -178,6 +198,20 @@ class WorkerTaskUpdateTestCase(TestCase):
         self.assigned_task.refresh_from_db()
         self.assertEqual(self.assigned_task.status, 'in_progress')
     
+    def test_status_change_conflicts_when_task_moved_concurrently(self):
+        """Test that a status change based on a stale read is rejected with 409."""
+        url = reverse('task-set-status', kwargs={'pk': self.assigned_task.id})
+        headers = self.get_auth_headers(self.field_worker)
+        
+        # Another request moves the task after this one has loaded it
+        stale_task = Task.objects.get(pk=self.assigned_task.id)
+        Task.objects.filter(pk=self.assigned_task.id).update(status='in_progress')
+        
+        with mock.patch.object(TaskViewSet, 'get_object', return_value=stale_task):
+            response = self.client.post(url, data={'status': 'in_progress'}, **headers)
+        
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+    
     def test_worker_cannot_directly_mark_task_completed(self):
         """Test that workers cannot directly mark task as completed."""
         url = reverse('task-set-status', kwargs={'pk': self.assigned_task.id})
@@ -196,18 +230,18 @@ class WorkerTaskUpdateTestCase(TestCase):
         headers = self.get_auth_headers(self.field_worker)
         
         # Create a test file
-        test_file = SimpleUploadedFile(
-            "test_proof.jpg",
-            b"file_content",
-            content_type="image/jpeg"
-        )
+        test_file = self._make_proof_file()
         
         proof_data = {
             'proof_upload': test_file,
             'notes': 'Task completed successfully. Photo attached as proof.'
         }
         
-        response = self.client.post(url, data=proof_data, **headers)
+        # Token user lookup, task read joined to its service request, one
+        # UPDATE for proof and status, then the service request sync; the
+        # savepoint pair comes from the test's transaction
+        with self.assertNumQueries(6):
+            response = self.client.post(url, data=proof_data, **headers)
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['status'], 'completed')
@@ -224,52 +258,61 @@ class WorkerTaskUpdateTestCase(TestCase):
         self.service_request.refresh_from_db()
         self.assertEqual(self.service_request.status, 'completed')
     
-    def test_worker_can_upload_proof_with_notes_only(self):
-        """Test that workers can upload proof with notes only (no file)."""
+    def test_proof_upload_writes_only_changed_columns(self):
+        """Test that a proof upload leaves untouched task columns out of its UPDATE."""
         url = reverse('task-upload-proof', kwargs={'pk': self.assigned_task.id})
         headers = self.get_auth_headers(self.field_worker)
         
-        proof_data = {
-            'notes': 'Task completed successfully. All work done as requested.'
-        }
-        
-        response = self.client.post(url, data=proof_data, **headers)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(url, data={'notes': 'Done.'}, **headers)
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data['status'], 'completed')
-        self.assertEqual(response.data['notes'], 'Task completed successfully. All work done as requested.')
-        
-        # Verify task was updated in database
-        self.assigned_task.refresh_from_db()
-        self.assertEqual(self.assigned_task.status, 'completed')
-        self.assertEqual(self.assigned_task.notes, 'Task completed successfully. All work done as requested.')
+        task_update = next(q['sql'] for q in queries.captured_queries if q['sql'].startswith('UPDATE "tasks"'))
+        self.assertIn('"notes"', task_update)
+        self.assertIn('"status"', task_update)
+        self.assertNotIn('"service_request_id"', task_update)
+        self.assertNotIn('"proof_upload"', task_update)
     
-    def test_worker_can_upload_proof_with_file_only(self):
-        """Test that workers can upload proof with file only (no notes)."""
+    def test_upload_proof_variants(self):
+        """Test how each kind of proof payload completes, or leaves, an assigned task."""
         url = reverse('task-upload-proof', kwargs={'pk': self.assigned_task.id})
         headers = self.get_auth_headers(self.field_worker)
         
-        # Create a test file
-        test_file = SimpleUploadedFile(
-            "test_proof.jpg",
-            b"file_content",
-            content_type="image/jpeg"
-        )
-        
-        proof_data = {
-            'proof_upload': test_file
-        }
-        
-        response = self.client.post(url, data=proof_data, **headers)
-        
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data['status'], 'completed')
-        self.assertIsNotNone(response.data['proof_upload'])
-        
-        # Verify task was updated in database
-        self.assigned_task.refresh_from_db()
-        self.assertEqual(self.assigned_task.status, 'completed')
-        self.assertTrue(self.assigned_task.proof_upload)
+        # Payloads are built per case because each request consumes its files
+        cases = [
+            ('notes only', lambda: {'notes': 'Task completed successfully. All work done as requested.'}, 'completed'),
+            ('updated notes', lambda: {'notes': 'Updated notes: Started working on the task.'}, 'completed'),
+            ('file only', lambda: {'proof_upload': self._make_proof_file()}, 'completed'),
+            # Django doesn't validate file types by default
+            ('non-image file', lambda: {
+                'proof_upload': self._make_proof_file('test_proof.txt', content_type='text/plain'),
+                'notes': 'Task completed.',
+            }, 'completed'),
+            # No proof provided, so the status stays put
+            ('empty', dict, 'assigned'),
+        ]
+        for case, make_payload, expected_status in cases:
+            with self.subTest(case=case):
+                payload = make_payload()
+                # Roll back after each case so the next starts from the fixture task
+                savepoint = transaction.savepoint()
+                try:
+                    response = self.client.post(url, data=payload, **headers)
+                    
+                    self.assertEqual(response.status_code, status.HTTP_200_OK)
+                    self.assertEqual(response.data['status'], expected_status)
+                    
+                    # Verify task was updated in database
+                    task = Task.objects.get(pk=self.assigned_task.pk)
+                    self.assertEqual(task.status, expected_status)
+                    if 'notes' in payload:
+                        self.assertEqual(response.data['notes'], payload['notes'])
+                        self.assertEqual(task.notes, payload['notes'])
+                    if 'proof_upload' in payload:
+                        self.assertIsNotNone(response.data['proof_upload'])
+                        self.assertTrue(task.proof_upload)
+                finally:
+                    transaction.savepoint_rollback(savepoint)
     
     def test_worker_cannot_upload_proof_for_other_workers_task(self):
         """Test that workers cannot upload proof for other workers' tasks."""
@@ -277,11 +320,7 @@ class WorkerTaskUpdateTestCase(TestCase):
         headers = self.get_auth_headers(self.field_worker)
         
         # Create a test file
-        test_file = SimpleUploadedFile(
-            "test_proof.jpg",
-            b"file_content",
-            content_type="image/jpeg"
-        )
+        test_file = self._make_proof_file()
         
         proof_data = {
             'proof_upload': test_file,
@@ -303,38 +342,13 @@ class WorkerTaskUpdateTestCase(TestCase):
         
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
     
-    def test_worker_can_update_notes_only(self):
-        """Test that workers can update notes without changing status."""
-        url = reverse('task-upload-proof', kwargs={'pk': self.assigned_task.id})
-        headers = self.get_auth_headers(self.field_worker)
-        
-        proof_data = {
-            'notes': 'Updated notes: Started working on the task.'
-        }
-        
-        response = self.client.post(url, data=proof_data, **headers)
-        
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data['notes'], 'Updated notes: Started working on the task.')
-        # Status should be completed since notes were provided (auto-completion logic)
-        self.assertEqual(response.data['status'], 'completed')
-        
-        # Verify task was updated in database
-        self.assigned_task.refresh_from_db()
-        self.assertEqual(self.assigned_task.notes, 'Updated notes: Started working on the task.')
-        self.assertEqual(self.assigned_task.status, 'completed')
-    
     def test_worker_can_update_in_progress_task_with_proof(self):
         """Test that workers can upload proof for in_progress tasks."""
         url = reverse('task-upload-proof', kwargs={'pk': self.in_progress_task.id})
         headers = self.get_auth_headers(self.field_worker)
         
         # Create a test file
-        test_file = SimpleUploadedFile(
-            "test_proof.jpg",
-            b"file_content",
-            content_type="image/jpeg"
-        )
+        test_file = self._make_proof_file()
         
         proof_data = {
             'proof_upload': test_file,
@@ -360,11 +374,7 @@ class WorkerTaskUpdateTestCase(TestCase):
         headers = self.get_auth_headers(self.field_worker)
         
         # Create a test file
-        test_file = SimpleUploadedFile(
-            "test_proof.jpg",
-            b"file_content",
-            content_type="image/jpeg"
-        )
+        test_file = self._make_proof_file()
         
         proof_data = {
             'proof_upload': test_file,
@@ -408,11 +418,7 @@ class WorkerTaskUpdateTestCase(TestCase):
         headers = self.get_auth_headers(self.admin)
         
         # Create a test file
-        test_file = SimpleUploadedFile(
-            "admin_proof.jpg",
-            b"admin_file_content",
-            content_type="image/jpeg"
-        )
+        test_file = self._make_proof_file('admin_proof.jpg', b'admin_file_content')
         
         proof_data = {
             'proof_upload': test_file,
@@ -430,7 +436,10 @@ class WorkerTaskUpdateTestCase(TestCase):
         url = reverse('task-list')
         headers = self.get_auth_headers(self.customer)
         
-        response = self.client.get(url, **headers)
+        # Token user lookup, page count and page rows joined to their service
+        # requests; nothing per row
+        with self.assertNumQueries(3):
+            response = self.client.get(url, **headers)
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         # Should see tasks for both service requests
@@ -471,11 +480,7 @@ class WorkerTaskUpdateTestCase(TestCase):
         headers = self.get_auth_headers(self.customer)
         
         # Create a test file
-        test_file = SimpleUploadedFile(
-            "customer_proof.jpg",
-            b"customer_file_content",
-            content_type="image/jpeg"
-        )
+        test_file = self._make_proof_file('customer_proof.jpg', b'customer_file_content')
         
         proof_data = {
             'proof_upload': test_file,
@@ -507,67 +512,117 @@ class WorkerTaskUpdateTestCase(TestCase):
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn('Cannot transition from assigned to completed', str(response.data))
     
-    def test_upload_proof_with_invalid_file_type(self):
-        """Test uploading proof with invalid file type."""
+    def test_service_request_status_sync_on_task_completion(self):
+        """Test that service request status is synced when task is completed."""
+        # Ensure service request is in_progress
+        self.service_request.status = 'in_progress'
+        self.service_request.save()
+        
         url = reverse('task-upload-proof', kwargs={'pk': self.assigned_task.id})
         headers = self.get_auth_headers(self.field_worker)
         
-        # Create a test file with invalid content type
-        test_file = SimpleUploadedFile(
-            "test_proof.txt",
-            b"file_content",
-            content_type="text/plain"
-        )
+        # Create a test file
+        test_file = self._make_proof_file()
         
         proof_data = {
             'proof_upload': test_file,
-            'notes': 'Task completed.'
+            'notes': 'Task completed successfully.'
         }
         
         response = self.client.post(url, data=proof_data, **headers)
         
-        # Should still work as Django doesn't validate file types by default
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data['status'], 'completed')
+        
+        # Verify service request status was updated
+        self.service_request.refresh_from_db()
+        self.assertEqual(self.service_request.status, 'completed')
     
-    def test_upload_proof_with_empty_notes_and_file(self):
-        """Test uploading proof with empty notes and no file."""
+    def test_service_request_sync_drops_cached_customer_summary(self):
+        """Test that completing a task drops the customer's cached dashboard counts."""
+        cache.set(customer_summary_key(self.customer.id), {'data': {}, 'etag': '"stale"'})
         url = reverse('task-upload-proof', kwargs={'pk': self.assigned_task.id})
         headers = self.get_auth_headers(self.field_worker)
         
-        proof_data = {}
-        
-        response = self.client.post(url, data=proof_data, **headers)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url, data={'notes': 'Task completed successfully.'}, **headers)
         
-        # Should work but not change status since no proof was provided
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data['status'], 'assigned')
+        self.assertIsNone(cache.get(customer_summary_key(self.customer.id)))
     
-    def test_service_request_status_sync_on_task_completion(self):
-        """Test that service request status is synced when task is completed."""
-        # Ensure service request is in_progress
-        self.service_request.status = 'in_progress'
-        self.service_request.save()
-        
-        url = reverse('task-upload-proof', kwargs={'pk': self.assigned_task.id})
-        headers = self.get_auth_headers(self.field_worker)
+    def test_admin_can_bulk_set_task_statuses(self):
+        """Test that admins can move several tasks in one call and completion syncs service requests."""
+        url = reverse('task-bulk-set-status')
+        headers = self.get_auth_headers(self.admin)
+        changes = [
+            {'task': self.assigned_task.id, 'status': 'in_progress'},
+            {'task': self.in_progress_task.id, 'status': 'completed'},
+            {'task': self.other_worker_task.id, 'status': 'assigned'},
+        ]
+        
+        # Token user lookup, validation read, one UPDATE per (from, to) pair,
+        # the re-read joined to service requests and their sync, plus the
+        # savepoint pair the test's transaction puts around the writes
+        with self.assertNumQueries(8):
+            response = self.client.post(url, data=changes, format='json', **headers)
         
-        # Create a test file
-        test_file = SimpleUploadedFile(
-            "test_proof.jpg",
-            b"file_content",
-            content_type="image/jpeg"
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            {task['id']: task['status'] for task in response.data},
+            {change['task']: change['status'] for change in changes}
+        )
+        self.assertEqual(
+            dict(Task.objects.filter(pk__in=[c['task'] for c in changes]).values_list('id', 'status')),
+            {change['task']: change['status'] for change in changes}
         )
         
-        proof_data = {
-            'proof_upload': test_file,
-            'notes': 'Task completed successfully.'
-        }
+        # Only the request whose task completed is synced
+        self.service_request.refresh_from_db()
+        self.assertEqual(self.service_request.status, 'completed')
+        self.service_request_other.refresh_from_db()
+        self.assertEqual(self.service_request_other.status, 'in_progress')
+    
+    def test_bulk_set_status_drops_dashboard_counts_on_commit(self):
+        """Test that bulk status changes drop the cached dashboard counts only once they commit."""
+        url = reverse('task-bulk-set-status')
+        headers = self.get_auth_headers(self.admin)
+        keys = (ADMIN_OVERVIEW_KEY, customer_summary_key(self.customer.id), worker_summary_key(self.field_worker.id))
+        cache.set_many({key: 'stale' for key in keys})
+        
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.post(
+                url, data=[{'task': self.in_progress_task.id, 'status': 'completed'}], format='json', **headers
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            # Still cached until the write commits
+            self.assertEqual(cache.get_many(keys), {key: 'stale' for key in keys})
+        
+        for callback in callbacks:
+            callback()
+        self.assertEqual(cache.get_many(keys), {})
+    
+    def test_bulk_set_status_rejects_invalid_transitions_without_writing(self):
+        """Test that one invalid transition fails the whole batch."""
+        url = reverse('task-bulk-set-status')
+        headers = self.get_auth_headers(self.admin)
+        changes = [
+            {'task': self.assigned_task.id, 'status': 'in_progress'},
+            {'task': self.other_worker_task.id, 'status': 'completed'},
+        ]
         
-        response = self.client.post(url, data=proof_data, **headers)
+        response = self.client.post(url, data=changes, format='json', **headers)
         
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('Cannot transition from assigned to completed', str(response.data))
+        self.assigned_task.refresh_from_db()
+        self.assertEqual(self.assigned_task.status, 'assigned')
+    
+    def test_bulk_set_status_is_admin_only(self):
+        """Test that field workers cannot bulk change task statuses."""
+        url = reverse('task-bulk-set-status')
+        headers = self.get_auth_headers(self.field_worker)
         
-        # Verify service request status was updated
-        self.service_request.refresh_from_db()
-        self.assertEqual(self.service_request.status, 'completed')
+        response = self.client.post(
+            url, data=[{'task': self.assigned_task.id, 'status': 'in_progress'}], format='json', **headers
+        )
+        
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
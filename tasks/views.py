@@ -1,24 +1,50 @@
+from collections import defaultdict
+from functools import partial
+
+from django.db import transaction
+from django.utils import timezone
 from rest_framework import viewsets, permissions, status
 from rest_framework.mixins import UpdateModelMixin, DestroyModelMixin
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework.parsers import JSONParser, MultiPartParser, FormParser
 
+from dashboard.cache import invalidate_admin_overview, invalidate_customer_summary, invalidate_worker_summary
+from fieldops.serializers import optimize_queryset
+from service_requests.models import ServiceRequest
+from users.permissions import user_flags
 from .models import Task
 from .serializers import (
     TaskListSerializer,
     TaskDetailSerializer,
     TaskCreateUpdateSerializer,
     TaskStatusSerializer,
+    TaskBulkStatusSerializer,
     TaskProofUploadSerializer,
 )
 from .permissions import IsAdminOrAssigneeOrReadOnly
 from drf_yasg.utils import swagger_auto_schema
 
 
+def _complete_service_request(service_request):
+    """Mark a completed task's service request completed with a single UPDATE."""
+    if service_request.status == 'completed':
+        return
+    service_request.status = 'completed'
+    service_request.updated_at = timezone.now()
+    ServiceRequest.objects.filter(pk=service_request.pk).exclude(status='completed').update(
+        status='completed', updated_at=service_request.updated_at
+    )
+    # update() skips post_save, so drop the cached dashboard counts here
+    transaction.on_commit(invalidate_admin_overview)
+    transaction.on_commit(partial(invalidate_customer_summary, service_request.customer_id))
+
+
 class TaskViewSet(viewsets.ReadOnlyModelViewSet, UpdateModelMixin, DestroyModelMixin):
-    queryset = Task.objects.select_related('service_request', 'assigned_to').all()
-    permission_classes = [permissions.IsAuthenticated & IsAdminOrAssigneeOrReadOnly]
+    # Joins and, for lists, columns come from the action's serializer in
+    # get_queryset; TaskListSerializer reads through service_request
+    queryset = Task.objects.all()
+    permission_classes = [permissions.IsAuthenticated, IsAdminOrAssigneeOrReadOnly]
     parser_classes = (MultiPartParser, FormParser)
 
     @swagger_auto_schema(operation_summary="List tasks",
@@ -48,87 +74,160 @@ class TaskViewSet(viewsets.ReadOnlyModelViewSet, UpdateModelMixin, DestroyModelM
         return super().destroy(request, *args, **kwargs)
 
     def get_queryset(self):
-        user = self.request.user
-        if getattr(user, 'is_admin', False):
-            return self.queryset
-        if getattr(user, 'is_field_worker', False):
-            return self.queryset.filter(assigned_to=user)
+        flags = user_flags(self.request)
+        queryset = optimize_queryset(
+            super().get_queryset(), self.get_serializer_class(), trim_columns=self.action == 'list'
+        )
+        if self.action in ('set_status', 'upload_proof'):
+            # Completing a task syncs its service request; read it in the same query
+            queryset = queryset.select_related('service_request')
+        if flags.is_admin:
+            return queryset
+        if flags.is_field_worker:
+            return queryset.filter(assigned_to_id=self.request.user.pk)
         # customers: tasks tied to their service requests
-        return self.queryset.filter(service_request__customer=user)
+        return queryset.filter(service_request__customer_id=self.request.user.pk)
+
+    serializer_classes = {
+        'list': TaskListSerializer,
+        'retrieve': TaskDetailSerializer,
+        'update': TaskCreateUpdateSerializer,
+        'partial_update': TaskCreateUpdateSerializer,
+        'set_status': TaskStatusSerializer,
+        'bulk_set_status': TaskBulkStatusSerializer,
+        'upload_proof': TaskProofUploadSerializer,
+    }
 
     def get_serializer_class(self):
-        if self.action == 'list':
-            return TaskListSerializer
-        if self.action in ('update', 'partial_update'):
-            return TaskCreateUpdateSerializer
-        if self.action == 'set_status':
-            return TaskStatusSerializer
-        if self.action == 'upload_proof':
-            return TaskProofUploadSerializer
-        return TaskDetailSerializer
+        return self.serializer_classes.get(self.action, TaskDetailSerializer)
 
 
     @swagger_auto_schema(operation_summary="Update task status",
                          operation_description="Admin can set any status. Field worker can set assigned→in_progress; completion via proof upload.")
     @action(detail=True, methods=['post'], url_path='set-status')
     def set_status(self, request, pk=None):
+        # get_object() applies IsAdminOrAssigneeOrReadOnly, so non-admins
+        # only get this far for their own tasks
         task = self.get_object()
         serializer = TaskStatusSerializer(task, data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
-
-        # Non-admins can only move their own tasks between allowed states
-        if not getattr(request.user, 'is_admin', False) and task.assigned_to_id != request.user.id:
-            return Response({'detail': 'Not allowed'}, status=status.HTTP_403_FORBIDDEN)
+        is_admin = user_flags(request).is_admin
 
         # Field workers cannot directly set status to completed - they must upload proof
-        if (not getattr(request.user, 'is_admin', False) and 
-            serializer.validated_data.get('status') == 'completed'):
+        if not is_admin and serializer.validated_data.get('status') == 'completed':
             return Response({
                 'detail': 'Field workers cannot mark tasks as completed directly. Please upload proof of completion instead.'
             }, status=status.HTTP_400_BAD_REQUEST)
 
         old_status = task.status
-        serializer.save()
-        
-        # Sync service request status when task is completed
-        if task.status == 'completed' and old_status != 'completed':
-            service_request = task.service_request
-            if service_request.status != 'completed':
-                service_request.status = 'completed'
-                service_request.save()
+        new_status = serializer.validated_data.get('status', old_status)
+        if new_status != old_status:
+            # The task and its service request complete together or not at all
+            with transaction.atomic():
+                # Compare-and-swap: the UPDATE only lands if no other request has
+                # moved the task since it was read above
+                task.updated_at = timezone.now()
+                updated = Task.objects.filter(pk=task.pk, status=old_status).update(
+                    status=new_status, updated_at=task.updated_at
+                )
+                if not updated:
+                    return Response({
+                        'detail': 'Task status was changed by another request. Reload the task and try again.'
+                    }, status=status.HTTP_409_CONFLICT)
+                task.status = new_status
+                
+                # update() skips post_save, so drop the cached dashboard counts here
+                transaction.on_commit(invalidate_admin_overview)
+                transaction.on_commit(partial(invalidate_worker_summary, task.assigned_to_id))
+                
+                # Sync service request status when task is completed
+                if new_status == 'completed':
+                    _complete_service_request(task.service_request)
         
         return Response(TaskDetailSerializer(task).data)
 
+    @swagger_auto_schema(operation_summary="Set the status of several tasks at once",
+                         operation_description="Admin moves a list of tasks to new statuses in one call. Every transition is validated first; service requests of completed tasks are marked completed.",
+                         request_body=TaskBulkStatusSerializer(many=True))
+    @action(detail=False, methods=['post'], url_path='bulk-set-status', parser_classes=[JSONParser])
+    def bulk_set_status(self, request):
+        if not user_flags(request).is_admin:
+            return Response({'detail': 'Only admins can change several tasks at once.'}, status=status.HTTP_403_FORBIDDEN)
+        
+        serializer = TaskBulkStatusSerializer(data=request.data, many=True, allow_empty=False)
+        serializer.is_valid(raise_exception=True)
+        task_ids = [row['task'] for row in serializer.validated_data]
+        
+        # Group the actual changes by (from, to); rows already at their target are left alone
+        moves = defaultdict(list)
+        for row in serializer.validated_data:
+            if row['status'] != row['current_status']:
+                moves[row['current_status'], row['status']].append(row['task'])
+        moved_ids = {task_id for ids in moves.values() for task_id in ids}
+        completed_ids = {
+            task_id for (_, new_status), ids in moves.items() if new_status == 'completed' for task_id in ids
+        }
+        
+        now = timezone.now()
+        with transaction.atomic():
+            # One compare-and-swap UPDATE per (from, to) pair; any task moved
+            # since validation read it fails the whole batch
+            for (old_status, new_status), ids in moves.items():
+                updated = Task.objects.filter(pk__in=ids, status=old_status).update(
+                    status=new_status, updated_at=now
+                )
+                if updated != len(ids):
+                    transaction.set_rollback(True)
+                    return Response({
+                        'detail': 'Some tasks were changed by another request. Reload them and try again.'
+                    }, status=status.HTTP_409_CONFLICT)
+            
+            # Sync the service requests of completed tasks in one more UPDATE
+            tasks = list(Task.objects.filter(pk__in=task_ids).select_related('service_request'))
+            service_requests = {
+                task.service_request for task in tasks
+                if task.pk in completed_ids and task.service_request.status != 'completed'
+            }
+            if service_requests:
+                ServiceRequest.objects.filter(
+                    pk__in=[service_request.pk for service_request in service_requests]
+                ).exclude(status='completed').update(status='completed', updated_at=now)
+            
+            # Bulk writes skip model signals, so drop the cached dashboard
+            # counts here, once the write commits
+            transaction.on_commit(invalidate_admin_overview)
+            for worker_id in {task.assigned_to_id for task in tasks if task.pk in moved_ids}:
+                transaction.on_commit(partial(invalidate_worker_summary, worker_id))
+            for customer_id in {service_request.customer_id for service_request in service_requests}:
+                transaction.on_commit(partial(invalidate_customer_summary, customer_id))
+        
+        return Response(TaskDetailSerializer(tasks, many=True).data)
+
     @swagger_auto_schema(operation_summary="Upload proof for task",
                          operation_description="Field worker uploads file/notes. Automatically marks task and as completed.")
     @action(detail=True, methods=['post'], url_path='upload-proof')
     def upload_proof(self, request, pk=None):
+        # Ownership is checked by get_object(), as in set_status
         task = self.get_object()
-
-        if not getattr(request.user, 'is_admin', False) and task.assigned_to_id != request.user.id:
-            return Response({'detail': 'Not allowed'}, status=status.HTTP_403_FORBIDDEN)
+        is_admin = user_flags(request).is_admin
 
         serializer = TaskProofUploadSerializer(task, data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
         
-        old_status = task.status
-        serializer.save()
-        
-        # If field worker uploads proof, automatically mark task as completed
-        if (not getattr(request.user, 'is_admin', False) and 
-            task.status != 'completed' and 
-            (task.proof_upload or task.notes)):
-            task.status = 'completed'
-            task.save()
-            
-            # Sync service request status when task is completed
-            service_request = task.service_request
-            if service_request.status != 'completed':
-                service_request.status = 'completed'
-                service_request.save()
+        # If field worker uploads proof, automatically mark task as completed;
+        # the status goes out in the same UPDATE as the proof itself
+        data = serializer.validated_data
+        completes = (not is_admin and
+                     task.status != 'completed' and
+                     bool(data.get('proof_upload', task.proof_upload) or data.get('notes', task.notes)))
+        if completes:
+            # The task and its service request complete together or not at all
+            with transaction.atomic():
+                serializer.save(status='completed')
+                
+                # Sync service request status when task is completed
+                _complete_service_request(task.service_request)
+        else:
+            serializer.save()
         
         return Response(TaskDetailSerializer(task).data, status=status.HTTP_200_OK)
-
-from django.shortcuts import render
-
-# Create your views here.
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-15 03:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='role',
+            field=models.CharField(choices=[('admin', 'Admin'), ('field_worker', 'Field Worker'), ('customer', 'Customer')], db_index=True, default='customer', help_text='User role determining access permissions', max_length=20),
+        ),
+    ]
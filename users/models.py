@@ -1,7 +1,22 @@
-from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import AbstractUser, UserManager as BaseUserManager
 from django.db import models
 
 
+class UserManager(BaseUserManager):
+    """
+    Default user manager with role filters, so callers filter by role in SQL
+    without repeating the role strings.
+    """
+    def admins(self):
+        return self.filter(role='admin')
+    
+    def field_workers(self):
+        return self.filter(role='field_worker')
+    
+    def customers(self):
+        return self.filter(role='customer')
+
+
 class User(AbstractUser):
     """
     Custom User model with role-based access control.
@@ -16,6 +31,7 @@ class User(AbstractUser):
         max_length=20,
         choices=ROLE_CHOICES,
         default='customer',
+        db_index=True,
         help_text='User role determining access permissions'
     )
     
@@ -33,6 +49,8 @@ class User(AbstractUser):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = UserManager()
+    
     class Meta:
         db_table = 'users_user'
         verbose_name = 'User'
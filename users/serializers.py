@@ -1,6 +1,8 @@
 from rest_framework import serializers
 from django.contrib.auth import authenticate
 from django.contrib.auth.password_validation import validate_password
+from django.core.exceptions import ValidationError as DjangoValidationError
+from fieldops.serializers import CachedFieldsMixin, FlatRowRepresentationMixin
 from .models import User
 
 
@@ -8,7 +10,7 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
     """
     Serializer for user registration.
     """
-    password = serializers.CharField(write_only=True, validators=[validate_password])
+    password = serializers.CharField(write_only=True)
     password_confirm = serializers.CharField(write_only=True)
     
     class Meta:
@@ -26,21 +28,24 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         if attrs.get('role') == 'field_worker' and not attrs.get('phone_number'):
             raise serializers.ValidationError("Phone number is required for field workers.")
         
+        # Run the password validators last; they are the costly check and
+        # the cheap ones above already reject most bad submissions
+        try:
+            validate_password(attrs['password'])
+        except DjangoValidationError as exc:
+            raise serializers.ValidationError({'password': list(exc.messages)})
+        
         return attrs
     
     def create(self, validated_data):
         validated_data.pop('password_confirm')
         password = validated_data.pop('password')
-        role = validated_data.get('role')
-        user = User.objects.create_user(password=password, **validated_data)
         # only field worker requires approval
-        if role != 'field_worker':
-            user.is_approved = True
-            user.save(update_fields=["is_approved"])
-        return user
+        is_approved = validated_data.get('role') != 'field_worker'
+        return User.objects.create_user(password=password, is_approved=is_approved, **validated_data)
 
 
-class UserProfileSerializer(serializers.ModelSerializer):
+class UserProfileSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for user profile (read/update).
     """
@@ -73,7 +78,7 @@ class UserLoginSerializer(serializers.Serializer):
             raise serializers.ValidationError('Must include username and password.')
 
 
-class UserListSerializer(serializers.ModelSerializer):
+class UserListSerializer(CachedFieldsMixin, FlatRowRepresentationMixin, serializers.ModelSerializer):
     """
     Serializer for listing users (admin only).
     """
@@ -5,10 +5,12 @@ Tests user registration and login for all user roles.
 import json
 from django.test import TestCase
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework.test import APIClient
-from rest_framework import status
+from rest_framework import serializers, status
 from django.contrib.auth import get_user_model
 from rest_framework_simplejwt.tokens import RefreshToken
+from .serializers import UserListSerializer
 
 User = get_user_model()
 
@@ -129,6 +131,21 @@ class UserAuthenticationTestCase(TestCase):
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn('non_field_errors', response.data)
     
+    def test_registration_weak_password(self):
+        """Test registration with a password the validators reject."""
+        invalid_data = self.customer_data.copy()
+        invalid_data['password'] = invalid_data['password_confirm'] = '12345678'
+        
+        response = self.client.post(
+            self.register_url,
+            data=json.dumps(invalid_data),
+            content_type='application/json'
+        )
+        
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('password', response.data)
+        self.assertFalse(User.objects.filter(username='testcustomer').exists())
+    
     def test_registration_duplicate_username(self):
         """Test registration with duplicate username."""
         # Create first user
@@ -355,16 +372,142 @@ class UserAuthenticationTestCase(TestCase):
         self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access_token}')
         
         profile_url = reverse('users:profile')
-        response = self.client.get(profile_url)
+        # The token's user lookup is the profile itself
+        with self.assertNumQueries(1):
+            response = self.client.get(profile_url)
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['username'], 'testuser')
         self.assertEqual(response.data['email'], 'user@test.com')
         self.assertEqual(response.data['role'], 'customer')
     
+    def test_user_profile_revalidates_with_etag(self):
+        """Test that an unchanged profile answers If-None-Match with 304."""
+        user = User.objects.create_user(username='testuser', password='testpass123', role='customer')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+        profile_url = reverse('users:profile')
+        
+        response = self.client.get(profile_url)
+        etag = response['ETag']
+        
+        response = self.client.get(profile_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        
+        # A profile update bumps updated_at and with it the ETag
+        self.client.patch(profile_url, {'first_name': 'Updated'}, format='json')
+        
+        response = self.client.get(profile_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['first_name'], 'Updated')
+        self.assertNotEqual(response['ETag'], etag)
+    
     def test_user_profile_access_unauthorized(self):
         """Test user profile access without authentication."""
         profile_url = reverse('users:profile')
         response = self.client.get(profile_url)
         
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+    
+    def test_user_list_query_count_is_independent_of_users(self):
+        """Test that the admin user list reads every row in one query."""
+        admin = User.objects.create_user(
+            username='testadmin',
+            email='admin@test.com',
+            password='testpass123',
+            role='admin'
+        )
+        User.objects.bulk_create([
+            User(username=f'customer{i}', email=f'customer{i}@test.com', role='customer')
+            for i in range(10)
+        ])
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(admin).access_token}')
+        
+        # Token user lookup, page count and page rows
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('users:user_list'))
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 11)
+    
+    def test_list_serializer_matches_default_representation(self):
+        """Test that the flattened user list rows match DRF's field-by-field output."""
+        user = User(
+            id=5, username='testworker', email='worker@test.com', first_name='Test',
+            role='field_worker', is_approved=True, date_joined=timezone.now()
+        )
+        
+        serializer = UserListSerializer()
+        expected = serializers.ModelSerializer.to_representation(serializer, user)
+        
+        self.assertEqual(serializer.to_representation(user), dict(expected))
+    
+    def test_admin_approves_and_rejects_field_worker(self):
+        """Test approving and rejecting a field worker."""
+        admin = User.objects.create_user(username='testadmin', password='testpass123', role='admin')
+        worker = User.objects.create_user(username='testworker', password='testpass123', role='field_worker')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(admin).access_token}')
+        
+        for url_name, expected in (('users:approve_field_worker', True), ('users:reject_field_worker', False)):
+            with self.subTest(url_name=url_name):
+                # One UPDATE on top of the token user lookup
+                with self.assertNumQueries(2):
+                    response = self.client.post(reverse(url_name, kwargs={'user_id': worker.id}))
+                
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                worker.refresh_from_db()
+                self.assertIs(worker.is_approved, expected)
+    
+    def test_approve_unknown_field_worker_returns_404(self):
+        """Test that approving a user who is not a field worker is a 404."""
+        admin = User.objects.create_user(username='testadmin', password='testpass123', role='admin')
+        customer = User.objects.create_user(username='testcustomer', password='testpass123', role='customer')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(admin).access_token}')
+        
+        response = self.client.post(reverse('users:approve_field_worker', kwargs={'user_id': customer.id}))
+        
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        customer.refresh_from_db()
+        self.assertFalse(customer.is_approved)
+    
+    def test_admin_toggles_user_active(self):
+        """Test that toggling a user flips is_active each time."""
+        admin = User.objects.create_user(username='testadmin', password='testpass123', role='admin')
+        customer = User.objects.create_user(username='testcustomer', password='testpass123', role='customer')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(admin).access_token}')
+        url = reverse('users:activate_user', kwargs={'user_id': customer.id})
+        
+        for expected, message in ((False, 'User deactivated successfully.'), (True, 'User activated successfully.')):
+            # Token user lookup, then the locking read and the UPDATE inside
+            # a savepoint
+            with self.assertNumQueries(5):
+                response = self.client.post(url)
+            
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.data['message'], message)
+            customer.refresh_from_db()
+            self.assertIs(customer.is_active, expected)
+    
+    def test_toggle_unknown_user_returns_404(self):
+        """Test that toggling a user who does not exist is a 404."""
+        admin = User.objects.create_user(username='testadmin', password='testpass123', role='admin')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(admin).access_token}')
+        
+        response = self.client.post(reverse('users:activate_user', kwargs={'user_id': admin.id + 1}))
+        
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+    
+    def test_admin_endpoints_forbid_non_admins(self):
+        """Test that the user list and admin actions are forbidden to non-admins."""
+        customer = User.objects.create_user(username='testcustomer', password='testpass123', role='customer')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(customer).access_token}')
+        
+        response = self.client.get(reverse('users:user_list'))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(response.data, {'error': 'Permission denied.'})
+        for url_name in ('users:approve_field_worker', 'users:reject_field_worker', 'users:activate_user'):
+            with self.subTest(url_name=url_name):
+                response = self.client.post(reverse(url_name, kwargs={'user_id': customer.id}))
+                self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+                self.assertEqual(response.data, {'error': 'Permission denied.'})
+        customer.refresh_from_db()
+        self.assertTrue(customer.is_active)
@@ -4,9 +4,15 @@ from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from django.contrib.auth import authenticate
+from django.db import transaction
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
 # from drf_spectacular.utils import extend_schema, extend_schema_view
 from drf_yasg.utils import swagger_auto_schema
+from fieldops.serializers import optimize_queryset
 from .models import User
+from .permissions import IsAdminUserAction
 from .serializers import (
     UserRegistrationSerializer, 
     UserProfileSerializer, 
@@ -59,71 +65,72 @@ class UserProfileView(generics.RetrieveUpdateAPIView):
     
     def get_object(self):
         return self.request.user
+    
+    def retrieve(self, request, *args, **kwargs):
+        user = self.get_object()
+        # Profile writes and the admin actions all bump updated_at, so it
+        # versions the representation; repeat polls get a 304 without a render
+        etag = quote_etag(f'{user.pk}-{user.updated_at.timestamp()}')
+        response = get_conditional_response(request, etag=etag)
+        if response is not None:
+            return response
+        serializer = self.get_serializer(user)
+        return Response(serializer.data, headers={'ETag': etag})
 
 
 class UserListView(generics.ListAPIView):
     """List all users. Admin only."""
-    queryset = User.objects.all()
     serializer_class = UserListSerializer
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [permissions.IsAuthenticated, IsAdminUserAction]
     
     def get_queryset(self):
-        # Only admins can see all users
-        if self.request.user.is_admin:
-            return User.objects.all()
-        return User.objects.none()
+        # Select just the listed columns, in a stable order for pagination
+        return optimize_queryset(User.objects.order_by('id'), UserListSerializer, trim_columns=True)
+
+
+def _set_field_worker_approval(user_id, is_approved):
+    """Set a field worker's approval in one UPDATE; False if there is no such worker."""
+    return bool(User.objects.field_workers().filter(id=user_id).update(
+        is_approved=is_approved, updated_at=timezone.now()
+    ))
 
 
 @swagger_auto_schema(method='post', operation_summary="Approve field worker",
                      operation_description="Admin approves a field worker account.")
 @api_view(['POST'])
-@permission_classes([permissions.IsAuthenticated])
+@permission_classes([permissions.IsAuthenticated, IsAdminUserAction])
 def approve_field_worker(request, user_id):
     """Admin approves a field worker account."""
-    if not request.user.is_admin:
-        return Response({'error': 'Permission denied.'}, status=status.HTTP_403_FORBIDDEN)
-    
-    try:
-        user = User.objects.get(id=user_id, role='field_worker')
-        user.is_approved = True
-        user.save()
-        return Response({'message': 'Field worker approved successfully.'})
-    except User.DoesNotExist:
+    # One UPDATE, no fetch; the row count tells whether the worker exists
+    if not _set_field_worker_approval(user_id, True):
         return Response({'error': 'Field worker not found.'}, status=status.HTTP_404_NOT_FOUND)
+    return Response({'message': 'Field worker approved successfully.'})
 
 
 @swagger_auto_schema(method='post', operation_summary="Reject field worker",
                      operation_description="Admin rejects a field worker application.")
 @api_view(['POST'])
-@permission_classes([permissions.IsAuthenticated])
+@permission_classes([permissions.IsAuthenticated, IsAdminUserAction])
 def reject_field_worker(request, user_id):
     """Admin rejects a field worker application."""
-    if not request.user.is_admin:
-        return Response({'error': 'Permission denied.'}, status=status.HTTP_403_FORBIDDEN)
-    
-    try:
-        user = User.objects.get(id=user_id, role='field_worker')
-        user.is_approved = False
-        user.save()
-        return Response({'message': 'Field worker rejected.'})
-    except User.DoesNotExist:
+    if not _set_field_worker_approval(user_id, False):
         return Response({'error': 'Field worker not found.'}, status=status.HTTP_404_NOT_FOUND)
+    return Response({'message': 'Field worker rejected.'})
 
 
 @swagger_auto_schema(method='post', operation_summary="Toggle user active",
                      operation_description="Admin activates or deactivates a user account.")
 @api_view(['POST'])
-@permission_classes([permissions.IsAuthenticated])
+@permission_classes([permissions.IsAuthenticated, IsAdminUserAction])
 def activate_user(request, user_id):
     """Admin activates or deactivates a user account."""
-    if not request.user.is_admin:
-        return Response({'error': 'Permission denied.'}, status=status.HTTP_403_FORBIDDEN)
-    
-    try:
-        user = User.objects.get(id=user_id)
-        user.is_active = not user.is_active
-        user.save()
-        status_text = 'activated' if user.is_active else 'deactivated'
-        return Response({'message': f'User {status_text} successfully.'})
-    except User.DoesNotExist:
-        return Response({'error': 'User not found.'}, status=status.HTTP_404_NOT_FOUND)
+    with transaction.atomic():
+        # Lock the row so concurrent toggles apply in turn and each reports
+        # the value it wrote
+        was_active = User.objects.select_for_update().filter(id=user_id).values_list('is_active', flat=True).first()
+        if was_active is None:
+            return Response({'error': 'User not found.'}, status=status.HTTP_404_NOT_FOUND)
+        is_active = not was_active
+        User.objects.filter(id=user_id).update(is_active=is_active, updated_at=timezone.now())
+    status_text = 'activated' if is_active else 'deactivated'
+    return Response({'message': f'User {status_text} successfully.'})